@@ -1,3 +1,4 @@
+import cache
 import database as db
 import logger
 import sentry
@@ -11,5 +12,7 @@ _logger.info('App initialization started...')
 
 sentry.initialize_sentry(integrations=[RedisIntegration()])
 db.initialize_data_base(is_local=False)
+with db.unit_of_work():
+    _logger.info(f'Dictionaries caches are warmed up: {cache.Caching.warm_up()}')
 settings.check_config_integrity()
 threads.ThreadHolder.start_threads()
@@ -0,0 +1,68 @@
+"""
+Benchmark of events filtering by scrobbled artists.
+
+Usage:
+    python -m benchmarks.bench_artist_matching [-e events] [-a artists] [--skip-naive]
+
+Compares the former nested loop over events and artists with "ArtistMatcher".
+"""
+
+import argparse
+import random
+import time
+
+from getters.artist_matcher import ArtistMatcher
+
+_WORDS = (
+    'the', 'black', 'night', 'river', 'orchestra', 'jazz', 'band', 'electric', 'sound', 'moon', 'stone', 'city',
+    'quartet', 'live', 'tour', 'symphony', 'dream', 'fire', 'north', 'glass', 'concert', 'acoustic', 'club', 'rock'
+)
+
+
+def generate_artists(count: int, rng: random.Random) -> list[str]:
+    return [f'{" ".join(rng.choices(_WORDS, k=rng.randint(1, 3)))} {i}'.title() for i in range(count)]
+
+
+def generate_titles(count: int, artists: list[str], rng: random.Random) -> list[str]:
+    titles = []
+    for i in range(count):
+        words = ' '.join(rng.choices(_WORDS, k=rng.randint(3, 8)))
+        titles.append(f'{words} {rng.choice(artists)}' if i % 10 == 0 else words)
+    return titles
+
+
+def naive(titles: list[str], artists: list[str]) -> int:
+    found = []
+    for title in titles:
+        for artist in artists:
+            if artist in title and title not in found:
+                found.append(title)
+    return len(found)
+
+
+def automaton(titles: list[str], artists: list[str]) -> int:
+    matcher = ArtistMatcher(artists=artists, whole_words=False)
+    return sum(matcher.matches(title) for title in titles)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-e', '--events', type=int, default=10_000)
+    parser.add_argument('-a', '--artists', type=int, default=5_000)
+    parser.add_argument('--skip-naive', action='store_true')
+    args = parser.parse_args()
+    rng = random.Random(0)
+    artists = generate_artists(args.artists, rng)
+    titles = generate_titles(args.events, artists, rng)
+    print(f'{args.events} events x {args.artists} artists')
+    functions = {'nested loop': naive, 'ArtistMatcher': automaton}
+    if args.skip_naive:
+        del functions['nested loop']
+    for name, function in functions.items():
+        start = time.perf_counter()
+        found = function(titles, artists)
+        print(f'{name:<15}{time.perf_counter() - start:8.3f} s, {found} events matched')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark of LastFM scrobbles page decoding modes.
+
+Usage:
+    python -m benchmarks.bench_scrobble_decoding [recorded_pages_dir] [-n repeats]
+
+Recorded pages are raw "user.getrecenttracks" responses saved as *.json files.
+If no directory is passed, a generated page of 200 tracks is used.
+"""
+
+import argparse
+import json
+import pathlib
+import timeit
+
+from getters.getter_lastfm_scrobble_data import LastFMScrobbleDataGetter, _loads
+
+
+def generate_page(tracks: int = 200) -> bytes:
+    def image(size: str) -> dict:
+        return {
+            'size': size,
+            '#text': f'https://lastfm.freetls.fastly.net/i/u/{size}/2a96cbd8b46e442fc41c2b86b821562f.png'
+        }
+
+    return json.dumps({
+        'recenttracks': {
+            'track': [
+                {
+                    'artist': {'mbid': 'a74b1b7f-71a5-4011-9441-d0b5e4122711', '#text': f'Artist {i % 50}'},
+                    'streamable': '0',
+                    'image': [image(size) for size in ('small', 'medium', 'large', 'extralarge')],
+                    'mbid': '6b9a509f-6907-4a6e-9345-2f12da09ba4b',
+                    'album': {'mbid': '', '#text': f'Album {i % 120}'},
+                    'name': f'Track {i}',
+                    'url': f'https://www.last.fm/music/Artist+{i % 50}/_/Track+{i}',
+                    'date': {'uts': str(1609459200 + i * 240), '#text': '01 Jan 2021, 00:00'}
+                } for i in range(tracks)
+            ],
+            '@attr': {'user': 'user', 'totalPages': '1500', 'page': '1', 'perPage': '200', 'total': '300000'}
+        }
+    }).encode()
+
+
+def load_pages(directory: pathlib.Path) -> list[bytes]:
+    return [path.read_bytes() for path in sorted(directory.glob('*.json'))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages_dir', nargs='?', type=pathlib.Path)
+    parser.add_argument('-n', '--number', type=int, default=50)
+    args = parser.parse_args()
+    pages = load_pages(args.pages_dir) if args.pages_dir else [generate_page()]
+
+    parse_page = LastFMScrobbleDataGetter._parse_page
+    modes = {
+        'json + strict validation': lambda raw: parse_page(json.loads(raw), 1, strict=True),
+        'fast decode + strict validation': lambda raw: parse_page(_loads(raw), 1, strict=True),
+        'fast decode + lean validation': lambda raw: parse_page(_loads(raw), 1),
+    }
+    print(f'{len(pages)} page(s), {args.number} runs each')
+    for name, function in modes.items():
+        seconds = min(timeit.repeat(lambda: [function(page) for page in pages], number=args.number, repeat=3))
+        print(f'{name:<34}{seconds / args.number / len(pages) * 1000:8.3f} ms/page')
+
+
+if __name__ == '__main__':
+    main()
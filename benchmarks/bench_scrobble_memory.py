@@ -0,0 +1,84 @@
+"""
+Memory benchmark of in-flight scrobbles representations.
+
+Usage:
+    python -m benchmarks.bench_scrobble_memory [-n scrobbles]
+
+Compares a list of per-instance "__dict__" dataclasses with seven attributes (the former "Scrobble")
+against "ScrobbleBatch" for the same generated history.
+"""
+
+import argparse
+import dataclasses
+import datetime
+import json
+import tracemalloc
+import typing
+
+from getters.getter_lastfm_scrobble_data import ScrobbleBatch
+
+
+@dataclasses.dataclass
+class LegacyScrobble:
+    album: str
+    album_mbid: str
+    artist: str
+    artist_mbid: str
+    date: datetime.datetime
+    track: str
+    track_mbid: str
+
+
+def generate_tracks(count: int) -> typing.Iterator[dict]:
+    """Yields tracks as decoded from JSON, so equal names are distinct string objects."""
+    for i in range(count):
+        yield json.loads(json.dumps({
+            'artist': f'Artist {i % 2000}',
+            'album': f'Album {i % 6000}',
+            'track': f'Track {i % 40000}',
+            'mbid': '6b9a509f-6907-4a6e-9345-2f12da09ba4b',
+            'uts': 1609459200 + i * 240
+        }))
+
+
+def build_legacy(count: int) -> list[LegacyScrobble]:
+    return [
+        LegacyScrobble(
+            album=track['album'],
+            album_mbid=track['mbid'],
+            artist=track['artist'],
+            artist_mbid=track['mbid'],
+            date=datetime.datetime.utcfromtimestamp(track['uts']),
+            track=track['track'],
+            track_mbid=track['mbid']
+        ) for track in generate_tracks(count)
+    ]
+
+
+def build_batch(count: int) -> ScrobbleBatch:
+    batch = ScrobbleBatch()
+    for track in generate_tracks(count):
+        batch.append(artist=track['artist'], album=track['album'], track=track['track'], timestamp=track['uts'])
+    return batch
+
+
+def measure(builder: typing.Callable[[int], typing.Any], count: int) -> int:
+    tracemalloc.start()
+    result = builder(count)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--number', type=int, default=300_000)
+    args = parser.parse_args()
+    print(f'{args.number} scrobbles')
+    for name, builder in (('list of dataclasses', build_legacy), ('ScrobbleBatch', build_batch)):
+        print(f'{name:<22}{measure(builder, args.number) / 2 ** 20:8.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark of scrobbles ingestion into the local SQLite database.
+
+Usage:
+    python -m benchmarks.bench_sqlite_ingest [-n scrobbles] [-b bunch size]
+
+Ingests the same generated history with "Scrobbles.add_many" into a fresh database file
+with SQLite defaults and with the local performance profile from "DataBase" settings.
+"""
+
+import argparse
+import dataclasses
+import datetime
+import os
+import tempfile
+import time
+
+from peewee import SqliteDatabase
+
+import cache
+import settings
+from database import models
+
+
+@dataclasses.dataclass
+class GeneratedScrobble:
+    album: str
+    artist: str
+    date: datetime.datetime
+    track: str
+
+
+def generate_scrobbles(count: int) -> list[GeneratedScrobble]:
+    start = datetime.datetime(2021, 1, 1)
+    return [
+        GeneratedScrobble(
+            album=f'Album {i % 6000}',
+            artist=f'Artist {i % 2000}',
+            date=start + datetime.timedelta(seconds=i * 240),
+            track=f'Track {i % 40000}'
+        ) for i in range(count)
+    ]
+
+
+def ingest(scrobbles: list[GeneratedScrobble], bunch_size: int, pragmas: dict) -> float:
+    """Returns ingestion rate in rows per second. Every bunch is committed in its own transaction."""
+    with tempfile.TemporaryDirectory() as directory:
+        data_base = SqliteDatabase(
+            os.path.join(directory, 'bench-db'),
+            pragmas=pragmas,
+            timeout=settings.DataBase.sqlite_busy_timeout / 1000
+        )
+        models.db.initialize(data_base)
+        models.BaseModel.recreate_tables()
+        models.SchemaVersion.migrate()
+        for dictionary in (models.Artists, models.Albums, models.Tracks):
+            cache.Caching.get_dictionary_cache(dictionary).clear()
+        start = time.perf_counter()
+        for i in range(0, len(scrobbles), bunch_size):
+            models.Scrobbles.add_many(scrobbles[i:i + bunch_size])
+        elapsed = time.perf_counter() - start
+        data_base.close()
+    return len(scrobbles) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', type=int, default=50000, help='number of scrobbles')
+    parser.add_argument('-b', type=int, default=200, help='scrobbles per "add_many" call, as in one LastFM page')
+    args = parser.parse_args()
+
+    # Only the database is measured, dictionary ids are not looked up in a shared cache.
+    cache.Backend.set(cache.NullBackend())
+    scrobbles = generate_scrobbles(args.n)
+    default = ingest(scrobbles, bunch_size=args.b, pragmas={})
+    tuned = ingest(scrobbles, bunch_size=args.b, pragmas=models.get_sqlite_pragmas())
+    print(f'SQLite defaults:      {default:>10.0f} rows/s')
+    print(f'Performance profile:  {tuned:>10.0f} rows/s ({tuned / default:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -54,7 +54,7 @@ class Bot:
                 ).
                 join(db.Places).switch(db.Events).
                 join(db.EventDates, join_type=peewee.JOIN.LEFT_OUTER).
-                where(db.Events.is_sent != True).
+                where(~db.Events.is_sent).
                 dicts().
                 execute()
             )
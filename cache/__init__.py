@@ -1,7 +1,17 @@
 __all__ = [
     'redis_cache',
-    'Caching'
+    'Backend',
+    'BackendStats',
+    'CacheBackend',
+    'Caching',
+    'DictionaryCacheStats',
+    'DictionaryIdCache',
+    'MemoryBackend',
+    'NullBackend',
+    'RedisBackend'
 ]
 
+from .backends import Backend, BackendStats, CacheBackend, MemoryBackend, NullBackend, RedisBackend
 from .cache import redis_cache
 from .caching import Caching
+from .dictionary_cache import DictionaryCacheStats, DictionaryIdCache
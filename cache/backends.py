@@ -0,0 +1,295 @@
+import abc
+import collections
+import dataclasses
+import threading
+import time
+import typing
+
+import redis
+
+import settings
+
+Value = typing.Union[bytes, str, int]
+
+# Compare-and-delete in a single round trip, so a key set by another client in between is not deleted.
+_DELETE_IF_EQUALS_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _to_bytes(value: Value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+@dataclasses.dataclass
+class BackendStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    requests: int = 0
+    latency: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def average_latency(self) -> float:
+        return self.latency / self.requests if self.requests else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f'{self.hits} hits ({self.hit_rate:.0%}), {self.misses} misses, {self.evictions} evictions, '
+            f'{self.requests} requests with {self.average_latency * 1000:.2f} ms average latency'
+        )
+
+
+class CacheBackend(abc.ABC):
+    """
+    Base class for storages of the cache.
+
+    Public methods count hits, misses and latency of requests, subclasses implement the underscored ones.
+    Values are returned as bytes, as Redis returns them.
+    """
+
+    def __init__(self):
+        self.stats = BackendStats()
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> typing.Optional[bytes]:
+        return self.mget([key])[0]
+
+    def mget(self, keys: list[str]) -> list[typing.Optional[bytes]]:
+        start = time.perf_counter()
+        values = self._mget(keys)
+        hits = sum(value is not None for value in values)
+        self._count(start, hits=hits, misses=len(values) - hits)
+        return values
+
+    def set(self, key: str, value: Value, ex: typing.Optional[int] = None, nx: bool = False) -> bool:
+        """Sets the value for "ex" seconds. With "nx", only if the key is not set. Returns whether it was set."""
+        start = time.perf_counter()
+        is_set = self._set(key, value, ex=ex, nx=nx)
+        self._count(start)
+        return is_set
+
+    def set_many(self, items: list[tuple[str, Value, typing.Optional[int]]]) -> None:
+        """Sets values with a single request. Items are tuples of key, value and expiration in seconds."""
+        if not items:
+            return
+        start = time.perf_counter()
+        self._set_many(items)
+        self._count(start)
+
+    def delete(self, key: str) -> None:
+        start = time.perf_counter()
+        self._delete(key)
+        self._count(start)
+
+    def delete_if_equals(self, key: str, value: Value) -> bool:
+        """Atomically deletes the key if it holds the value. Returns whether it was deleted."""
+        start = time.perf_counter()
+        is_deleted = self._delete_if_equals(key, value)
+        self._count(start)
+        return is_deleted
+
+    def get_stats(self) -> BackendStats:
+        with self._stats_lock:
+            return dataclasses.replace(self.stats)
+
+    def _count(self, start: float, hits: int = 0, misses: int = 0, evictions: int = 0) -> None:
+        with self._stats_lock:
+            self.stats.requests += 1
+            self.stats.latency += time.perf_counter() - start
+            self.stats.hits += hits
+            self.stats.misses += misses
+            self.stats.evictions += evictions
+
+    @abc.abstractmethod
+    def _mget(self, keys: list[str]) -> list[typing.Optional[bytes]]:
+        pass
+
+    @abc.abstractmethod
+    def _set(self, key: str, value: Value, ex: typing.Optional[int], nx: bool) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def _set_many(self, items: list[tuple[str, Value, typing.Optional[int]]]) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _delete(self, key: str) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _delete_if_equals(self, key: str, value: Value) -> bool:
+        pass
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis storage. The client connects on the first request through a connection pool.
+
+    Evictions are the "evicted_keys" of the Redis server, they are requested with the stats.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._client: typing.Optional[redis.Redis] = None
+        self._delete_if_equals_script: typing.Optional[redis.commands.core.Script] = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> redis.Redis:
+        with self._lock:
+            if self._client is None:
+                pool = redis.ConnectionPool(
+                    host=settings.Redis.host,
+                    port=settings.Redis.port,
+                    db=settings.Redis.db_cache,
+                    max_connections=settings.Redis.max_connections,
+                    socket_timeout=settings.Redis.socket_timeout
+                )
+                self._client = redis.Redis(connection_pool=pool)
+                self._delete_if_equals_script = self._client.register_script(_DELETE_IF_EQUALS_SCRIPT)
+            return self._client
+
+    def get_stats(self) -> BackendStats:
+        try:
+            evictions = self.client.info('stats').get('evicted_keys', 0)
+        except redis.RedisError:
+            return super().get_stats()
+        with self._stats_lock:
+            self.stats.evictions = evictions
+        return super().get_stats()
+
+    def _mget(self, keys: list[str]) -> list[typing.Optional[bytes]]:
+        return self.client.mget(keys)
+
+    def _set(self, key: str, value: Value, ex: typing.Optional[int], nx: bool) -> bool:
+        return bool(self.client.set(name=key, value=value, ex=ex, nx=nx))
+
+    def _set_many(self, items: list[tuple[str, Value, typing.Optional[int]]]) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value, ex in items:
+            pipeline.set(name=key, value=value, ex=ex)
+        pipeline.execute()
+
+    def _delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def _delete_if_equals(self, key: str, value: Value) -> bool:
+        client = self.client
+        return bool(self._delete_if_equals_script(keys=[key], args=[value], client=client))
+
+
+class MemoryBackend(CacheBackend):
+    """In-process storage with expiration and LRU eviction of keys beyond "max_entries"."""
+
+    def __init__(self, max_entries: int = settings.Redis.memory_max_entries):
+        super().__init__()
+        self.max_entries = max_entries
+        self._values: collections.OrderedDict[str, tuple[bytes, float]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _mget(self, keys: list[str]) -> list[typing.Optional[bytes]]:
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                value, expires = self._values.get(key, (None, 0.0))
+                if value is not None and expires <= now:
+                    del self._values[key]
+                    value = None
+                if value is not None:
+                    self._values.move_to_end(key)
+                values.append(value)
+        return values
+
+    def _set(self, key: str, value: Value, ex: typing.Optional[int], nx: bool) -> bool:
+        with self._lock:
+            if nx and key in self._values and self._values[key][1] > time.monotonic():
+                return False
+            self._put(key, value, ex)
+        return True
+
+    def _set_many(self, items: list[tuple[str, Value, typing.Optional[int]]]) -> None:
+        with self._lock:
+            for key, value, ex in items:
+                self._put(key, value, ex)
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+    def _delete_if_equals(self, key: str, value: Value) -> bool:
+        with self._lock:
+            stored, expires = self._values.get(key, (None, 0.0))
+            if stored != _to_bytes(value) or expires <= time.monotonic():
+                return False
+            del self._values[key]
+        return True
+
+    def _put(self, key: str, value: Value, ex: typing.Optional[int]) -> None:
+        self._values[key] = (_to_bytes(value), time.monotonic() + ex if ex else float('inf'))
+        self._values.move_to_end(key)
+        evictions = 0
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+            evictions += 1
+        if evictions:
+            with self._stats_lock:
+                self.stats.evictions += evictions
+
+
+class NullBackend(CacheBackend):
+    """Storage that keeps nothing, every request is a miss."""
+
+    def _mget(self, keys: list[str]) -> list[typing.Optional[bytes]]:
+        return [None] * len(keys)
+
+    def _set(self, key: str, value: Value, ex: typing.Optional[int], nx: bool) -> bool:
+        return True
+
+    def _set_many(self, items: list[tuple[str, Value, typing.Optional[int]]]) -> None:
+        pass
+
+    def _delete(self, key: str) -> None:
+        pass
+
+    def _delete_if_equals(self, key: str, value: Value) -> bool:
+        return False
+
+
+_BACKENDS: dict[str, typing.Type[CacheBackend]] = {
+    'redis': RedisBackend,
+    'memory': MemoryBackend,
+    'none': NullBackend
+}
+
+
+class Backend:
+    """Holder of the cache backend chosen by "Redis.backend" setting."""
+
+    _backend: typing.Optional[CacheBackend] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> CacheBackend:
+        with cls._lock:
+            if cls._backend is None:
+                name = settings.Redis.backend
+                if name not in _BACKENDS:
+                    raise ValueError(f'Unknown cache backend "{name}", expected one of: {", ".join(_BACKENDS)}')
+                cls._backend = _BACKENDS[name]()
+            return cls._backend
+
+    @classmethod
+    def set(cls, backend: typing.Optional[CacheBackend]) -> None:
+        """Replaces the backend, the configured one is used again after None is set."""
+        with cls._lock:
+            cls._backend = backend
@@ -1,32 +1,222 @@
+import contextlib
+import datetime
+import functools
+import hashlib
+import inspect
 import json
+import threading
+import time
 import typing
-
-import redis
+import uuid
 
 import settings
+from cache.backends import Backend
+
+_LEASE_POLL_INTERVAL = 0.05
+
+
+def _serialize(value: typing.Any) -> typing.Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    raise TypeError(f'Value of type {type(value).__name__} can not be used in a cache key')
+
+
+def get_key_prefix(function: typing.Callable, version: int = 1) -> str:
+    """
+    Returns namespace of the function keys.
+
+    It consists of the "Redis.namespace" with the "Redis.key_version" setting,
+    the module-qualified name of the function and its own version.
+    Bumping any of the versions invalidates the keys of the whole namespace.
+    """
+    return (
+        f'{settings.Redis.namespace}:v{settings.Redis.key_version}:'
+        f'{function.__module__}.{function.__qualname__}:v{version}'
+    )
+
+
+def get_key(prefix: str, signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+    """
+    Returns key of the function call.
+
+    Arguments are bound to the function parameters, so positional and keyword calls get the same key,
+    then serialized to canonical JSON and hashed with SHA-256, so keys do not depend on the process.
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = json.dumps(bound.arguments, sort_keys=True, default=_serialize, separators=(',', ':'))
+    return f'{prefix}:{hashlib.sha256(arguments.encode()).hexdigest()}'
+
+
+class _KeyLocks:
+    """Map of per-key locks. Locks are removed once no thread holds or waits for them."""
+
+    def __init__(self):
+        self._locks: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def hold(self, key: str) -> typing.Iterator[None]:
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+
+_key_locks = _KeyLocks()
+
+
+def _get(key: str) -> tuple[bool, typing.Any]:
+    """Returns whether the key is cached and its value."""
+    result = Backend.get().get(key)
+    if result is None:
+        return False, None
+    return True, json.loads(result)
+
+
+def _acquire_lease(key: str, lease_ttl: int) -> typing.Optional[str]:
+    token = uuid.uuid4().hex
+    return token if Backend.get().set(f'{key}:lease', token, ex=lease_ttl, nx=True) else None
 
-_redis_cache = redis.Redis(
-    host=settings.Redis.host,
-    port=settings.Redis.port,
-    # password=settings.Redis.password,
-    db=settings.Redis.db_cache
-)
 
+def _release_lease(key: str, token: str) -> None:
+    """Releases the lease if it is still held with the token, as it may have expired and been taken by another."""
+    Backend.get().delete_if_equals(f'{key}:lease', token)
 
-def redis_cache(ttl: int = settings.Redis.ttl):
+
+def _wait_for(key: str, timeout: float) -> tuple[bool, typing.Any]:
+    """Waits for the value computed by the lease holder."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(_LEASE_POLL_INTERVAL)
+        is_cached, value = _get(key)
+        if is_cached:
+            return is_cached, value
+    return False, None
+
+
+class _CacheOptions(typing.NamedTuple):
+    prefix: str
+    signature: inspect.Signature
+    ttl: int
+    cache_none: bool
+    none_ttl: int
+    lease_ttl: typing.Optional[int]
+
+
+def _get_item(options: _CacheOptions, key: str, value: typing.Any) -> typing.Optional[tuple[str, str, int]]:
+    """Returns the item to be cached, or None if the value is not cached."""
+    if value is None and not options.cache_none:
+        return None
+    return key, json.dumps(value), options.none_ttl if value is None else options.ttl
+
+
+def _compute(function: typing.Callable, options: _CacheOptions, key: str, args: tuple, kwargs: dict) -> typing.Any:
+    """Calls the function and caches its result. With a lease, the result of its holder is awaited instead."""
+    token = None
+    if options.lease_ttl:
+        token = _acquire_lease(key, options.lease_ttl)
+        if token is None:
+            is_cached, value = _wait_for(key, timeout=options.lease_ttl)
+            if is_cached:
+                return value
+    try:
+        value = function(*args, **kwargs)
+        item = _get_item(options, key, value)
+        if item:
+            Backend.get().set(*item)
+    finally:
+        if token:
+            _release_lease(key, token)
+    return value
+
+
+def _get_or_compute(function: typing.Callable, options: _CacheOptions, args: tuple, kwargs: dict) -> typing.Any:
+    """Returns the cached result of the call. Concurrent misses of the key in the process are single-flight."""
+    key = get_key(options.prefix, options.signature, args, kwargs)
+    is_cached, value = _get(key)
+    if is_cached:
+        return value
+    with _key_locks.hold(key):
+        is_cached, value = _get(key)
+        if is_cached:
+            return value
+        return _compute(function, options, key, args, kwargs)
+
+
+def _get_many(function: typing.Callable,
+              options: _CacheOptions,
+              args_list: typing.Iterable[tuple],
+              batch_function: typing.Optional[typing.Callable[[list[tuple]], list]] = None) -> list:
+    """
+    Returns results of the function for each of the passed arguments tuples.
+
+    Keys are requested with a single MGET, results of the misses are stored with a single pipeline.
+
+    :param args_list: positional arguments of the calls
+    :param batch_function: function that returns results for a list of arguments tuples,
+        the function itself is called for each miss if it is not passed
+    """
+    args_list = list(args_list)
+    keys = [get_key(options.prefix, options.signature, args, {}) for args in args_list]
+    if not keys:
+        return []
+    values = {key: json.loads(value) for key, value in zip(keys, Backend.get().mget(keys)) if value is not None}
+    missing = {key: args for key, args in zip(keys, args_list) if key not in values}
+    if missing:
+        results = (
+            batch_function(list(missing.values())) if batch_function
+            else [function(*args) for args in missing.values()]
+        )
+        values.update(zip(missing, results))
+        items = [_get_item(options, key, value) for key, value in zip(missing, results)]
+        Backend.get().set_many([item for item in items if item])
+    return [values[key] for key in keys]
+
+
+def redis_cache(ttl: int = settings.Redis.ttl,
+                version: int = 1,
+                cache_none: bool = False,
+                none_ttl: int = settings.Redis.none_ttl,
+                lease_ttl: typing.Optional[int] = None):
+    """
+    Caches JSON-serializable results of the function for "ttl" seconds in the configured backend.
+
+    Concurrent misses of a key in the process are single-flight: the function is called once
+    and the other callers get its result. With "lease_ttl", a short lease in the backend
+    extends this to other processes.
+
+    :param ttl: time to live of the cached results in seconds
+    :param version: version of the function results, bump it if they are changed
+    :param cache_none: whether to cache None results, they are not cached by default
+    :param none_ttl: time to live of the cached None results in seconds
+    :param lease_ttl: time in seconds other processes wait for the result of the lease holder
+    """
     def decorator(function: typing.Callable):
+        options = _CacheOptions(
+            prefix=get_key_prefix(function, version=version),
+            signature=inspect.signature(function),
+            ttl=ttl,
+            cache_none=cache_none,
+            none_ttl=none_ttl,
+            lease_ttl=lease_ttl
+        )
+
+        @functools.wraps(function)
         def wrapper(*args, **kwargs):
-            key = f'{function.__name__}_{hash(args)}_{hash(frozenset(kwargs.items()))}'
-            result = _redis_cache.get(key)
-            if result is None:
-                value = function(*args, **kwargs)
-                value_json = json.dumps(value)
-                _redis_cache.set(name=key, value=value_json, ex=ttl)
-            else:
-                value_json = result.decode('utf-8')
-                value = json.loads(value_json)
-            return value
+            return _get_or_compute(function, options, args, kwargs)
 
+        wrapper.get_key = lambda *args, **kwargs: get_key(options.prefix, options.signature, args, kwargs)
+        wrapper.get_many = functools.partial(_get_many, function, options)
         return wrapper
 
     return decorator
@@ -1,26 +1,98 @@
+import contextlib
 import datetime
+import typing
 
 import cache
 import database as db
+from cache.backends import Backend
+from cache.dictionary_cache import DictionaryIdCache
+
+
+class _ScrobbleArgs(typing.NamedTuple):
+    artist: str
+    album: str
+    track: str
+    date: datetime.datetime
 
 
 class Caching:
-    @staticmethod
-    @cache.redis_cache()
-    def get_artist_id(name: str) -> int:
-        return db.Artists.add(name=name).id
+    _dictionaries: dict[str, DictionaryIdCache] = {}
 
-    @staticmethod
-    @cache.redis_cache()
-    def get_album_id(name: str) -> int:
-        return db.Albums.add(name=name).id
+    @classmethod
+    def get_dictionary_cache(cls, model: type) -> DictionaryIdCache:
+        if model.__name__ not in cls._dictionaries:
+            cls._dictionaries[model.__name__] = DictionaryIdCache(model=model)
+        return cls._dictionaries[model.__name__]
 
-    @staticmethod
-    @cache.redis_cache()
-    def get_track_id(name: str) -> int:
-        return db.Tracks.add(name=name).id
+    @classmethod
+    @contextlib.contextmanager
+    def deferred(cls) -> typing.Iterator[None]:
+        """Caches ids of the artists, albums and tracks stored in the block only if it succeeds."""
+        with contextlib.ExitStack() as stack:
+            for model in (db.Artists, db.Albums, db.Tracks):
+                stack.enter_context(cls.get_dictionary_cache(model).deferred())
+            yield
+
+    @classmethod
+    def warm_up(cls) -> dict[str, int]:
+        """Fills local tiers of the dictionaries caches. Returns numbers of the loaded names."""
+        return {
+            model.__name__: cls.get_dictionary_cache(model).warm_up()
+            for model in (db.Artists, db.Albums, db.Tracks)
+        }
+
+    @classmethod
+    def get_stats(cls) -> str:
+        stats = [f'{name}: {cache_.stats}' for name, cache_ in cls._dictionaries.items()]
+        return '; '.join(stats + [f'backend: {Backend.get().get_stats()}'])
+
+    @classmethod
+    def get_artist_id(cls, name: str) -> int:
+        return cls.get_dictionary_cache(db.Artists).get_id(name)
+
+    @classmethod
+    def get_album_id(cls, name: str) -> int:
+        return cls.get_dictionary_cache(db.Albums).get_id(name)
+
+    @classmethod
+    def get_track_id(cls, name: str) -> int:
+        return cls.get_dictionary_cache(db.Tracks).get_id(name)
+
+    @classmethod
+    def get_artist_ids(cls, names: typing.Iterable[str]) -> list[int]:
+        return cls._get_ids(db.Artists, names)
+
+    @classmethod
+    def get_album_ids(cls, names: typing.Iterable[str]) -> list[int]:
+        return cls._get_ids(db.Albums, names)
+
+    @classmethod
+    def get_track_ids(cls, names: typing.Iterable[str]) -> list[int]:
+        return cls._get_ids(db.Tracks, names)
 
     @staticmethod
     @cache.redis_cache()
     def get_scrobble_id(artist: str, album: str, track: str, scrobble_date: datetime.datetime) -> int:
         return db.Scrobbles.add(artist=artist, album=album, track=track, scrobble_date=scrobble_date).id
+
+    @classmethod
+    def get_scrobble_ids(cls, scrobbles: typing.Iterable[tuple[str, str, str, datetime.datetime]]) -> list[int]:
+        """
+        Returns ids of the scrobbles, the missing ones are stored.
+
+        :param scrobbles: tuples of artist, album, track and scrobble date
+        """
+        return cls.get_scrobble_id.get_many(scrobbles, batch_function=cls._add_scrobbles)
+
+    @classmethod
+    def _get_ids(cls, model: type, names: typing.Iterable[str]) -> list[int]:
+        names = list(names)
+        ids = cls.get_dictionary_cache(model).resolve_many(names)
+        return [ids[name] for name in names]
+
+    @staticmethod
+    def _add_scrobbles(scrobbles: list[tuple[str, str, str, datetime.datetime]]) -> list[int]:
+        rows = [_ScrobbleArgs(*scrobble) for scrobble in scrobbles]
+        db.Scrobbles.add_many(rows)
+        ids = db.Scrobbles.get_ids(row.date for row in rows)
+        return [ids[row.date] for row in rows]
@@ -0,0 +1,163 @@
+import collections
+import contextlib
+import dataclasses
+import hashlib
+import threading
+import typing
+
+import redis
+
+import settings
+from cache.backends import Backend
+
+
+@dataclasses.dataclass
+class DictionaryCacheStats:
+    local_hits: int = 0
+    backend_hits: int = 0
+    misses: int = 0
+
+    @property
+    def local_hit_rate(self) -> float:
+        lookups = self.local_hits + self.backend_hits + self.misses
+        return self.local_hits / lookups if lookups else 0.0
+
+    @property
+    def backend_hit_rate(self) -> float:
+        lookups = self.backend_hits + self.misses
+        return self.backend_hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f'local {self.local_hits} hits ({self.local_hit_rate:.0%}), '
+            f'backend {self.backend_hits} hits ({self.backend_hit_rate:.0%}), {self.misses} misses'
+        )
+
+
+class DictionaryIdCache:
+    """
+    Two-tier cache of ids of a dictionary table names.
+
+    Names are looked up in the in-process LRU first, then in the cache backend, then in the table itself,
+    where missing names are inserted. Found ids are put into the upper tiers.
+
+    Ids of the names stored within a "deferred" block are put into the upper tiers only after it succeeds,
+    so ids of rows of a rolled back transaction are never cached.
+    """
+
+    def __init__(self, model: typing.Any, capacity: int = settings.Redis.dictionary_cache_size):
+        self.model = model
+        self.capacity = capacity
+        self.stats = DictionaryCacheStats()
+        self._ids: collections.OrderedDict[str, int] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = threading.local()
+        self._key_prefix = (
+            f'{settings.Redis.namespace}:v{settings.Redis.key_version}:dictionary:{model.__name__.lower()}'
+        )
+
+    def warm_up(self) -> int:
+        """Fills the local tier with the latest names of the table with a single streaming query."""
+        query = (
+            self.model
+            .select(self.model.name, self.model.id)
+            .order_by(self.model.id.desc())
+            .limit(self.capacity)
+            .tuples()
+        )
+        with self._lock:
+            for name, name_id in query.iterator():
+                self._ids.setdefault(name, name_id)
+                self._ids.move_to_end(name, last=False)
+            return len(self._ids)
+
+    @contextlib.contextmanager
+    def deferred(self) -> typing.Iterator[None]:
+        """
+        Holds ids of the names stored in the block back from the upper tiers until the block succeeds.
+
+        They are dropped if the block fails. Wrap the outermost transaction that stores names with it,
+        nested blocks of the same thread are a part of the outer one.
+        """
+        if getattr(self._pending, 'ids', None) is not None:
+            yield
+            return
+        self._pending.ids = {}
+        try:
+            yield
+            ids = self._pending.ids
+        finally:
+            self._pending.ids = None
+        self._publish(ids)
+
+    def get_id(self, name: str) -> int:
+        return self.resolve_many([name])[name]
+
+    def resolve_many(self, names: typing.Iterable[str]) -> dict[str, int]:
+        """
+        Returns ids of the passed names.
+
+        Each tier is requested once for the whole batch: with a single MGET for the cache backend
+        and with a single SELECT and INSERT per bunch for the table.
+        """
+        ids: dict[str, int] = {}
+        missing: list[str] = []
+        with self._lock:
+            for name in dict.fromkeys(names):
+                if name in self._ids:
+                    self._ids.move_to_end(name)
+                    ids[name] = self._ids[name]
+                else:
+                    missing.append(name)
+            self.stats.local_hits += len(ids)
+        if not missing:
+            return ids
+
+        found = self._get_from_backend(missing)
+        missing = [name for name in missing if name not in found]
+        with self._lock:
+            self.stats.backend_hits += len(found)
+            self.stats.misses += len(missing)
+        stored = self.model.get_ids(missing) if missing else {}
+        self._put(found)
+        pending = getattr(self._pending, 'ids', None)
+        if pending is None:
+            self._publish(stored)
+        else:
+            pending.update(stored)
+
+        ids.update(found)
+        ids.update(stored)
+        return ids
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+    def _put(self, ids: dict[str, int]) -> None:
+        with self._lock:
+            self._ids.update(ids)
+            while len(self._ids) > self.capacity:
+                self._ids.popitem(last=False)
+
+    def _get_key(self, name: str) -> str:
+        return f'{self._key_prefix}:{hashlib.sha256(name.encode()).hexdigest()}'
+
+    def _get_from_backend(self, names: list[str]) -> dict[str, int]:
+        try:
+            values = Backend.get().mget([self._get_key(name) for name in names])
+        except redis.RedisError:
+            return {}
+        return {name: int(value) for name, value in zip(names, values) if value is not None}
+
+    def _publish(self, ids: dict[str, int]) -> None:
+        """Puts ids of the stored names into the local tier and the cache backend."""
+        if not ids:
+            return
+        self._put(ids)
+        # The setting is read from the file on every access, so it is read once for the whole batch.
+        ttl = settings.Redis.ttl
+        try:
+            Backend.get().set_many([(self._get_key(name), name_id, ttl) for name, name_id in ids.items()])
+        except redis.RedisError:
+            pass
@@ -1,21 +1,53 @@
 __all__ = [
     'Artists',
+    'ArtistDailyPlays',
+    'ArtistPlays',
+    'AlbumDailyPlays',
     'Albums',
     'Tracks',
     'Scrobbles',
+    'ScrobbleSyncPages',
+    'ScrobbleSyncRuns',
     'EventDates',
+    'EventHashes',
     'Events',
+    'IngestResult',
     'Places',
     'Log',
-    'initialize_data_base'
+    'LogRecord',
+    'LogSink',
+    'SchemaVersion',
+    'Period',
+    'Statistics',
+    'atomic',
+    'close_connection',
+    'PoolStats',
+    'get_pool_stats',
+    'initialize_data_base',
+    'unit_of_work'
 ]
 
+from .log_sink import LogRecord, LogSink
+from .models import AlbumDailyPlays
 from .models import Albums
+from .models import ArtistDailyPlays
+from .models import ArtistPlays
 from .models import Artists
 from .models import EventDates
+from .models import EventHashes
 from .models import Events
+from .models import IngestResult
 from .models import Log
 from .models import Places
+from .models import SchemaVersion
 from .models import Scrobbles
+from .models import ScrobbleSyncPages
+from .models import ScrobbleSyncRuns
 from .models import Tracks
+from .models import atomic
+from .models import close_connection
+from .models import get_pool_stats
 from .models import initialize_data_base
+from .models import unit_of_work
+from .pool import PoolStats
+from .statistics import Period, Statistics
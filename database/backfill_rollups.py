@@ -0,0 +1,31 @@
+"""
+Rebuilds plays rollups from the stored scrobbles.
+
+Usage:
+    python -m database.backfill_rollups [--local]
+
+Rollups are kept up to date on scrobbles ingestion and filled once on startup if they are empty,
+so the command is needed only if they have diverged from "Scrobbles", e.g. after manual edits.
+"""
+
+import argparse
+import time
+
+from database.models import AlbumDailyPlays, ArtistDailyPlays, ArtistPlays, initialize_data_base, unit_of_work
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--local', action='store_true', help='use the local SQLite database')
+    args = parser.parse_args()
+
+    initialize_data_base(is_local=args.local)
+    with unit_of_work():
+        for rollup in (ArtistDailyPlays, AlbumDailyPlays, ArtistPlays):
+            start = time.perf_counter()
+            rollup.rebuild()
+            print(f'Table {rollup.__name__} was rebuilt with {time.perf_counter() - start:.2f} seconds.')
+
+
+if __name__ == '__main__':
+    main()
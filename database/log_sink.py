@@ -0,0 +1,97 @@
+import datetime
+import queue
+import sys
+import threading
+import time
+import typing
+
+
+class LogRecord(typing.NamedTuple):
+    date: datetime.datetime
+    message: str
+    level: str
+
+
+_STOP = object()
+
+
+class LogSink:
+    """
+    Background writer of log records.
+
+    Records are put into a bounded queue and written by batches of "batch_size" records,
+    or of the records collected within "flush_interval" seconds after the first one.
+    If the queue is full, the record is dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self,
+                 write: typing.Callable[[list[LogRecord]], None],
+                 queue_size: int,
+                 batch_size: int,
+                 flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._write = write
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: typing.Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, record: LogRecord) -> bool:
+        """Queues the record. Returns False if it was dropped."""
+        self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._drop(1)
+            return False
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Writes the queued records and stops the writer."""
+        with self._lock:
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout=timeout)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.__class__.__name__, daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        is_stopped = False
+        while not is_stopped:
+            record = self._queue.get()
+            if record is _STOP:
+                break
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    is_stopped = True
+                    break
+                batch.append(record)
+            self._write_batch(batch)
+
+    # noinspection PyBroadException
+    def _write_batch(self, batch: list[LogRecord]) -> None:
+        try:
+            self._write(batch)
+        except Exception as e:
+            self._drop(len(batch))
+            print(f'Failed to write {len(batch)} log records: {e}', file=sys.stderr)
+
+    def _drop(self, count: int) -> None:
+        with self._lock:
+            self.dropped += count
@@ -0,0 +1,67 @@
+"""
+Versioned schema migrations.
+
+Tables are created by "BaseModel.recreate_tables" in order of their "migration_priority",
+then migrations with versions above the recorded one are applied in order.
+Statements have to be valid for both SQLite and Postgres, and safe to run on any existing schema.
+Columns are added only to tables that do not have them yet, as new tables are created with all of their columns.
+"""
+
+import typing
+
+
+class Column(typing.NamedTuple):
+    table: str
+    name: str
+    definition: str
+
+
+class Migration(typing.NamedTuple):
+    version: int
+    description: str
+    statements: tuple[str, ...] = ()
+    columns: tuple[Column, ...] = ()
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description='Add partial index on unsent events',
+        statements=(
+            'CREATE INDEX IF NOT EXISTS events_unsent ON events (event_id) WHERE NOT is_sent',
+        )
+    ),
+    Migration(
+        version=2,
+        description='Add unique index on event dates',
+        statements=(
+            'DELETE FROM eventdates WHERE id NOT IN '
+            '(SELECT MIN(id) FROM eventdates GROUP BY event_id, date_start, date_stop)',
+            'CREATE UNIQUE INDEX IF NOT EXISTS eventdates_event_id_date_start_date_stop '
+            'ON eventdates (event_id, date_start, date_stop)',
+        )
+    ),
+    Migration(
+        version=3,
+        description='Add composite indexes on scrobbles',
+        statements=(
+            'CREATE INDEX IF NOT EXISTS scrobbles_artist_id_scrobble_date ON scrobbles (artist_id, scrobble_date)',
+            'CREATE INDEX IF NOT EXISTS scrobbles_album_id_scrobble_date ON scrobbles (album_id, scrobble_date)',
+        )
+    ),
+    Migration(
+        version=4,
+        description='Add attempts and failed pages of scrobbles sync runs',
+        columns=(
+            Column(table='scrobblesyncruns', name='attempts', definition='INTEGER NOT NULL DEFAULT 1'),
+            Column(table='scrobblesyncruns', name='failed_pages', definition='TEXT'),
+        )
+    ),
+    Migration(
+        version=5,
+        description='Add fetch time of places details',
+        columns=(
+            Column(table='places', name='fetched', definition='TIMESTAMP'),
+        )
+    ),
+)
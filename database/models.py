@@ -1,3 +1,5 @@
+import collections
+import contextlib
 import datetime
 import functools
 import importlib
@@ -7,33 +9,99 @@ import typing
 
 from peewee import (
     CharField, Model, ForeignKeyField, IntegerField, Proxy, SqliteDatabase, BooleanField, DateTimeField, AutoField,
-    PostgresqlDatabase
+    PostgresqlDatabase, OperationalError, chunked, fn, DateField, EXCLUDED, TextField
 )
 
 import cache
 import settings
+from database.log_sink import LogRecord, LogSink
+from database.migrations import MIGRATIONS
+from database.pool import PoolStats, StatsPooledPostgresqlDatabase
 
 local_db = SqliteDatabase(os.path.join(os.path.dirname(__file__), 'cpb-local-db'))
 server_db = PostgresqlDatabase(database='', autorollback=True)
+pooled_server_db = StatsPooledPostgresqlDatabase(database='', autorollback=True)
 db = Proxy()
 
 
+def atomic() -> typing.ContextManager[typing.Any]:
+    """Returns a context manager of a transaction, or a savepoint if a transaction is already started."""
+    return db.atomic()
+
+
+def get_sqlite_pragmas() -> dict[str, typing.Any]:
+    """Returns pragmas of the local database performance profile, or none if the profile is turned off."""
+    if not settings.DataBase.sqlite_tuned:
+        return {}
+    return {
+        'journal_mode': settings.DataBase.sqlite_journal_mode,
+        'synchronous': settings.DataBase.sqlite_synchronous,
+        'cache_size': settings.DataBase.sqlite_cache_size,
+        'mmap_size': settings.DataBase.sqlite_mmap_size,
+        'temp_store': settings.DataBase.sqlite_temp_store
+    }
+
+
+def unit_of_work() -> typing.ContextManager[typing.Any]:
+    """
+    Holds a connection of the current thread for the block, then closes it or returns it to the pool.
+
+    Nested blocks use the connection of the outer one.
+    """
+    if not db.is_closed():
+        return contextlib.nullcontext()
+    return db.connection_context()
+
+
+def close_connection() -> None:
+    """Closes the connection of the current thread or returns it to the pool, if it is open."""
+    if not db.is_closed():
+        db.close()
+
+
+def get_pool_stats() -> typing.Optional[PoolStats]:
+    """Returns stats of the connections pool, if the database is pooled."""
+    if isinstance(db.obj, StatsPooledPostgresqlDatabase):
+        return db.obj.get_stats()
+    return None
+
+
 def initialize_data_base(is_local: bool = True) -> Proxy:
     if not is_local:
-        server_db.init(
+        connection_kwargs = dict(
             database=settings.DataBase.name,
             user=settings.DataBase.username,
             host=settings.DataBase.host,
             port=settings.DataBase.port,
             password=settings.DataBase.password
         )
-        server_db.connect(reuse_if_open=True)
-        db.initialize(server_db)
-        print('Database initialised as remote')
+        if settings.DataBase.pooled:
+            pooled_server_db.init(
+                max_connections=settings.DataBase.max_connections,
+                stale_timeout=settings.DataBase.stale_timeout,
+                timeout=settings.DataBase.connection_wait_timeout,
+                **connection_kwargs
+            )
+            db.initialize(pooled_server_db)
+            print('Database initialised as remote pooled')
+        else:
+            server_db.init(**connection_kwargs)
+            server_db.connect(reuse_if_open=True)
+            db.initialize(server_db)
+            print('Database initialised as remote')
     else:
+        local_db.init(
+            local_db.database,
+            pragmas=get_sqlite_pragmas(),
+            timeout=settings.DataBase.sqlite_busy_timeout / 1000
+        )
         db.initialize(local_db)
         print('Database initialised as local')
-    BaseModel.recreate_tables()
+    with unit_of_work():
+        BaseModel.recreate_tables()
+        SchemaVersion.migrate()
+        for rollup in (ArtistDailyPlays, AlbumDailyPlays, ArtistPlays):
+            rollup.seed()
     return db
 
 
@@ -71,17 +139,52 @@ class BaseModel(Model):
         return highest_priority
 
 
+class SchemaVersion(BaseModel):
+    """Versions of the applied schema migrations."""
+
+    migration_priority = 0
+
+    version = IntegerField(primary_key=True)
+    description = CharField()
+    applied = DateTimeField()
+
+    @classmethod
+    def get_version(cls) -> int:
+        return cls.select(fn.MAX(cls.version)).scalar() or 0
+
+    @classmethod
+    def migrate(cls) -> None:
+        """Applies migrations newer than the recorded schema version, each one in its own transaction."""
+        version = cls.get_version()
+        for migration in MIGRATIONS:
+            if migration.version <= version:
+                continue
+            with db.atomic():
+                for statement in migration.statements:
+                    db.execute_sql(statement)
+                for column in migration.columns:
+                    if column.name not in {stored.name for stored in db.get_columns(column.table)}:
+                        db.execute_sql(f'ALTER TABLE {column.table} ADD COLUMN {column.name} {column.definition}')
+                cls.create(
+                    version=migration.version,
+                    description=migration.description,
+                    applied=datetime.datetime.now()
+                )
+            print(f'Migration {migration.version} was applied: {migration.description}.')
+
+
 class Places(BaseModel):
     migration_priority = 0
 
     place_id = IntegerField(primary_key=True, index_type=True)
     address = CharField()
     title = CharField()
+    fetched = DateTimeField(null=True)
 
     @classmethod
     def add(cls, place_id: int, address: str, title: str) -> 'Places':
         try:
-            return cls.get(cls.place_id == place_id)
+            place = cls.get(cls.place_id == place_id)
         except cls.DoesNotExist:
             new = cls.create(
                 place_id=place_id,
@@ -89,6 +192,24 @@ class Places(BaseModel):
                 title=title
             )
             return new
+        if (place.address, place.title) != (address, title):
+            place.address = address
+            place.title = title
+            place.save()
+        return place
+
+    @classmethod
+    def add_many(cls, places: typing.Iterable[dict]) -> None:
+        """
+        Inserts places or updates the stored ones, with a statement per bunch.
+
+        :param places: rows with "place_id", "address", "title" and "fetched" keys,
+            "fetched" is the time the details were got from KudaGo
+        """
+        for bunch in chunked(places, settings.DataBase.bunch_size):
+            cls.insert_many(bunch).on_conflict(
+                conflict_target=[cls.place_id], preserve=[cls.address, cls.title, cls.fetched]
+            ).execute()
 
 
 class Events(BaseModel):
@@ -122,6 +243,27 @@ class Events(BaseModel):
             )
             return new
 
+    @classmethod
+    def add_many(cls, events: typing.Iterable[dict], updated: bool = False) -> None:
+        """
+        Stores events with a statement per bunch.
+
+        :param events: rows with "event_id", "title", "slug", "place_id" and "price" keys
+        :param updated: if set, stored events are rewritten and marked to be sent again as updated ones,
+            otherwise they are left as is
+        """
+        for bunch in chunked(events, settings.DataBase.bunch_size):
+            query = cls.insert_many(bunch)
+            if updated:
+                query = query.on_conflict(
+                    conflict_target=[cls.event_id],
+                    preserve=[cls.title, cls.slug, cls.place_id, cls.price],
+                    update={cls.updated: True, cls.is_sent: False}
+                )
+            else:
+                query = query.on_conflict_ignore()
+            query.execute()
+
     @classmethod
     def mark_as_sent(cls):
         cls.update(is_sent=True).where(Events.event_id == cls.event_id).execute()
@@ -142,6 +284,41 @@ class EventDates(BaseModel):
     def add(cls, event_id: int, date_start: datetime.datetime, date_stop: datetime.datetime) -> 'EventDates':
         return cls.get_or_create(event_id=event_id, date_start=date_start, date_stop=date_stop)[0]
 
+    @classmethod
+    def replace_many(cls, dates: dict[int, list[tuple[datetime.datetime, datetime.datetime]]]) -> None:
+        """Replaces stored dates of the passed events with the new ones. Repeated dates of an event are stored once."""
+        for bunch in chunked(dates.items(), settings.DataBase.bunch_size):
+            cls.delete().where(cls.event_id.in_([event_id for event_id, _ in bunch])).execute()
+            rows = [
+                {'event_id': event_id, 'date_start': start, 'date_stop': stop}
+                for event_id, event_dates in bunch for start, stop in dict.fromkeys(event_dates)
+            ]
+            for rows_bunch in chunked(rows, settings.DataBase.bunch_size):
+                cls.insert_many(rows_bunch).execute()
+
+
+class EventHashes(BaseModel):
+    """Hashes of events content as it was received last time. They are used to detect events changes."""
+
+    migration_priority = 2
+
+    event = ForeignKeyField(Events, primary_key=True, on_delete='CASCADE')
+    content_hash = CharField(max_length=64)
+
+    @classmethod
+    def get_hashes(cls, event_ids: typing.Iterable[int]) -> dict[int, str]:
+        hashes: dict[int, str] = {}
+        for bunch in chunked(event_ids, settings.DataBase.bunch_size):
+            hashes.update(cls.select(cls.event, cls.content_hash).where(cls.event.in_(bunch)).tuples())
+        return hashes
+
+    @classmethod
+    def set_hashes(cls, hashes: dict[int, str]) -> None:
+        for bunch in chunked(hashes.items(), settings.DataBase.bunch_size):
+            cls.insert_many(
+                [{'event': event_id, 'content_hash': content_hash} for event_id, content_hash in bunch]
+            ).on_conflict(conflict_target=[cls.event], preserve=[cls.content_hash]).execute()
+
 
 D = typing.TypeVar('D', bound='_DictionaryModel')
 
@@ -158,6 +335,18 @@ class _DictionaryModel(BaseModel):
     def add(cls: typing.Type[D], name: str) -> 'D':
         return cls.get_or_create(name=name)[0]
 
+    @classmethod
+    def get_ids(cls, names: typing.Iterable[str]) -> dict[str, int]:
+        """Returns ids of the passed names. Missing names are inserted with a single statement per bunch."""
+        ids: dict[str, int] = {}
+        for bunch in chunked(set(names), settings.DataBase.bunch_size):
+            ids.update(cls.select(cls.name, cls.id).where(cls.name.in_(bunch)).tuples())
+            missing = [name for name in bunch if name not in ids]
+            if missing:
+                cls.insert_many([{'name': name} for name in missing]).on_conflict_ignore().execute()
+                ids.update(cls.select(cls.name, cls.id).where(cls.name.in_(missing)).tuples())
+        return ids
+
 
 class Artists(_DictionaryModel):
     pass
@@ -175,6 +364,11 @@ class LogLevel(_DictionaryModel):
     pass
 
 
+class IngestResult(typing.NamedTuple):
+    inserted: int
+    skipped: int
+
+
 class Scrobbles(BaseModel):
     migration_priority = 1
 
@@ -189,12 +383,376 @@ class Scrobbles(BaseModel):
         try:
             return cls.get(cls.scrobble_date == scrobble_date)
         except cls.DoesNotExist:
-            return cls.create(
+            scrobble = cls.create(
                 track=cache.Caching.get_track_id(track),
                 artist=cache.Caching.get_artist_id(artist),
                 album=cache.Caching.get_album_id(album),
                 scrobble_date=scrobble_date
             )
+            cls._add_plays(
+                [{'artist': scrobble.artist_id, 'album': scrobble.album_id, 'scrobble_date': scrobble_date}]
+            )
+            return scrobble
+
+    @classmethod
+    def add_many(cls, scrobbles: typing.Iterable[typing.Any]) -> 'IngestResult':
+        """
+        Stores scrobbles with one transaction per bunch of "bunch_size" rows.
+
+        :param scrobbles: objects with "artist", "album", "track" and "date" attributes
+        :return: numbers of inserted and skipped (already stored) scrobbles
+        """
+        inserted = skipped = 0
+        for bunch in chunked(scrobbles, settings.DataBase.bunch_size):
+            count = cls._add_bunch(bunch)
+            inserted += count
+            skipped += len(bunch) - count
+        return IngestResult(inserted=inserted, skipped=skipped)
+
+    @classmethod
+    def _add_bunch(cls, bunch: list[typing.Any]) -> int:
+        attempt = 1
+        while True:
+            try:
+                # Ids of the dictionaries rows inserted by a rolled back bunch must not be cached.
+                with cache.Caching.deferred(), db.atomic():
+                    return cls._insert_bunch(bunch)
+            except OperationalError:
+                if attempt >= settings.DataBase.transaction_retry_limit:
+                    raise
+                attempt += 1
+
+    @classmethod
+    def _insert_bunch(cls, bunch: list[typing.Any]) -> int:
+        stored = {
+            date for date, in cls.select(cls.scrobble_date).where(
+                cls.scrobble_date.in_([scrobble.date for scrobble in bunch])
+            ).tuples()
+        }
+        new = {scrobble.date: scrobble for scrobble in bunch if scrobble.date not in stored}.values()
+        if not new:
+            return 0
+        artists = cache.Caching.get_dictionary_cache(Artists).resolve_many(scrobble.artist for scrobble in new)
+        albums = cache.Caching.get_dictionary_cache(Albums).resolve_many(scrobble.album for scrobble in new)
+        tracks = cache.Caching.get_dictionary_cache(Tracks).resolve_many(scrobble.track for scrobble in new)
+        rows = [
+            {
+                'artist': artists[scrobble.artist],
+                'album': albums[scrobble.album],
+                'track': tracks[scrobble.track],
+                'scrobble_date': scrobble.date
+            } for scrobble in new
+        ]
+        # Rows stored concurrently since the select are skipped, so only the returned ones are counted as plays.
+        inserted = list(
+            cls.insert_many(rows)
+            .on_conflict_ignore()
+            .returning(cls.artist, cls.album, cls.scrobble_date)
+            .dicts()
+            .execute()
+        )
+        cls._add_plays(inserted)
+        return len(inserted)
+
+    @staticmethod
+    def _add_plays(rows: list[dict]) -> None:
+        """Updates plays rollups with the new scrobbles rows."""
+        ArtistPlays.add_plays((row['artist'], row['scrobble_date']) for row in rows)
+        ArtistDailyPlays.add_plays((row['artist'], row['scrobble_date']) for row in rows)
+        AlbumDailyPlays.add_plays((row['album'], row['scrobble_date']) for row in rows)
+
+    @classmethod
+    def get_ids(cls, dates: typing.Iterable[datetime.datetime]) -> dict[datetime.datetime, int]:
+        """Returns ids of the stored scrobbles by their dates."""
+        ids: dict[datetime.datetime, int] = {}
+        for bunch in chunked(set(dates), settings.DataBase.bunch_size):
+            ids.update(cls.select(cls.scrobble_date, cls.id).where(cls.scrobble_date.in_(bunch)).tuples())
+        return ids
+
+    @classmethod
+    def get_last_scrobble_date(cls) -> typing.Optional[datetime.datetime]:
+        return cls.select(fn.MAX(cls.scrobble_date)).scalar()
+
+
+class _DailyPlaysModel(BaseModel):
+    """
+    Base class for rollups of scrobbles into daily numbers of plays by a dictionary.
+
+    Days are UTC ones, as scrobbles dates are.
+    Subclasses define "dictionary" and the foreign key named as the same field of "Scrobbles".
+    """
+
+    migration_priority = 1
+
+    id = AutoField()
+    day = DateField()
+    plays = IntegerField(default=0)
+
+    dictionary: typing.ClassVar[typing.Type[_DictionaryModel]]
+    key_name: typing.ClassVar[str]
+
+    @classmethod
+    def get_key(cls) -> ForeignKeyField:
+        return getattr(cls, cls.key_name)
+
+    @classmethod
+    def add_plays(cls, plays: typing.Iterable[tuple[int, datetime.datetime]]) -> None:
+        """
+        Increments numbers of plays with new scrobbles.
+
+        :param plays: pairs of the dictionary id and scrobble date
+        """
+        daily = collections.Counter((key, date.date()) for key, date in plays)
+        for bunch in chunked(daily.items(), settings.DataBase.bunch_size):
+            cls.insert_many(
+                [{cls.key_name: key, 'day': day, 'plays': count} for (key, day), count in bunch]
+            ).on_conflict(
+                conflict_target=[cls.get_key(), cls.day], update={cls.plays: cls.plays + EXCLUDED.plays}
+            ).execute()
+
+    @classmethod
+    def rebuild(cls) -> None:
+        """Recounts plays from all stored scrobbles."""
+        key = getattr(Scrobbles, cls.key_name)
+        day = fn.DATE(Scrobbles.scrobble_date)
+        with db.atomic():
+            cls.delete().execute()
+            cls.insert_from(
+                Scrobbles.select(key, day, fn.COUNT(Scrobbles.id)).group_by(key, day),
+                [cls.get_key(), cls.day, cls.plays]
+            ).execute()
+
+    @classmethod
+    def get_top(cls,
+                limit: typing.Optional[int] = None,
+                since: typing.Optional[datetime.date] = None) -> list[tuple[str, int]]:
+        """
+        Returns names of the most played dictionary entries with numbers of their plays.
+
+        :param limit: number of entries, all of them are returned if it is not set
+        :param since: first day to count plays from, all-time plays are counted if it is not set
+        """
+        plays = fn.SUM(cls.plays)
+        query = (
+            cls
+            .select(cls.dictionary.name, plays)
+            .join(cls.dictionary)
+            .group_by(cls.dictionary.id, cls.dictionary.name)
+            .order_by(plays.desc(), cls.dictionary.name)
+        )
+        if since is not None:
+            query = query.where(cls.day >= since)
+        if limit is not None:
+            query = query.limit(limit)
+        return list(query.tuples())
+
+    @classmethod
+    def get_new(cls, since: datetime.date) -> list[str]:
+        """Returns names of the dictionary entries first played since the passed day."""
+        first_day = fn.MIN(cls.day)
+        query = (
+            cls
+            .select(cls.dictionary.name)
+            .join(cls.dictionary)
+            .group_by(cls.dictionary.id, cls.dictionary.name)
+            .having(first_day >= since)
+            .order_by(first_day, cls.dictionary.name)
+        )
+        return [name for name, in query.tuples()]
+
+    @classmethod
+    def get_total_plays(cls, since: typing.Optional[datetime.date] = None) -> int:
+        query = cls.select(fn.SUM(cls.plays))
+        if since is not None:
+            query = query.where(cls.day >= since)
+        return query.scalar() or 0
+
+    @classmethod
+    def seed(cls) -> None:
+        """Counts plays from the stored scrobbles once, if they have not been counted yet."""
+        if cls.select().exists() or not Scrobbles.select().exists():
+            return
+        cls.rebuild()
+        print(f'Table {cls.__name__} was filled from the stored scrobbles.')
+
+
+class ArtistDailyPlays(_DailyPlaysModel):
+    artist = ForeignKeyField(Artists, on_delete='CASCADE')
+
+    dictionary = Artists
+    key_name = 'artist'
+
+    class Meta:
+        indexes = (
+            (('artist', 'day'), True),
+        )
+
+
+class AlbumDailyPlays(_DailyPlaysModel):
+    album = ForeignKeyField(Albums, on_delete='CASCADE')
+
+    dictionary = Albums
+    key_name = 'album'
+
+    class Meta:
+        indexes = (
+            (('album', 'day'), True),
+        )
+
+
+class ArtistPlays(BaseModel):
+    """
+    All-time numbers of artists plays. They are kept up to date on scrobbles ingestion.
+
+    Plays by days are kept in "ArtistDailyPlays" to rank artists over rolling periods.
+    """
+
+    migration_priority = 1
+
+    artist = ForeignKeyField(Artists, primary_key=True, on_delete='CASCADE')
+    plays = IntegerField(default=0)
+
+    @classmethod
+    def add_plays(cls, plays: typing.Iterable[tuple[int, datetime.datetime]]) -> None:
+        """
+        Increments numbers of plays with new scrobbles.
+
+        :param plays: pairs of artist id and scrobble date
+        """
+        total = collections.Counter(artist_id for artist_id, _ in plays)
+        for bunch in chunked(total.items(), settings.DataBase.bunch_size):
+            cls.insert_many(
+                [{'artist': artist_id, 'plays': count} for artist_id, count in bunch]
+            ).on_conflict(
+                conflict_target=[cls.artist], update={cls.plays: cls.plays + EXCLUDED.plays}
+            ).execute()
+
+    @classmethod
+    def get_top_artists(cls, limit: int, period_days: typing.Optional[int] = None) -> list[str]:
+        """
+        Returns names of the most played artists.
+
+        :param limit: number of artists
+        :param period_days: number of last days to rank artists by, all-time plays are used if it is not set
+        """
+        if period_days is not None:
+            since = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=period_days - 1)
+            return [name for name, _ in ArtistDailyPlays.get_top(limit=limit, since=since)]
+        query = cls.select(Artists.name).join(Artists).order_by(cls.plays.desc(), Artists.name).limit(limit)
+        return [name for name, in query.tuples()]
+
+    @classmethod
+    def rebuild(cls) -> None:
+        """Recounts all-time plays from "ArtistDailyPlays"."""
+        with db.atomic():
+            cls.delete().execute()
+            cls.insert_from(
+                ArtistDailyPlays.select(ArtistDailyPlays.artist, fn.SUM(ArtistDailyPlays.plays))
+                .group_by(ArtistDailyPlays.artist),
+                [cls.artist, cls.plays]
+            ).execute()
+
+    @classmethod
+    def seed(cls) -> None:
+        """Counts plays from "ArtistDailyPlays" once, if they have not been counted yet."""
+        if not cls.select().exists() and ArtistDailyPlays.select().exists():
+            cls.rebuild()
+            print(f'Table {cls.__name__} was filled from the stored scrobbles.')
+
+
+class ScrobbleSyncRuns(BaseModel):
+    """
+    Describes runs of LastFM scrobbles synchronisation. Finished runs hold the sync high-water mark.
+
+    Runs given up after too many attempts are finished too, pages they failed to store are kept in "failed_pages".
+    """
+
+    migration_priority = 0
+
+    id = AutoField()
+    is_full = BooleanField(default=False)
+    date_from = DateTimeField(null=True)
+    date_to = DateTimeField()
+    total_pages = IntegerField(default=0)
+    started = DateTimeField()
+    finished = DateTimeField(null=True)
+    attempts = IntegerField(default=1)
+    failed_pages = TextField(null=True)
+
+    @classmethod
+    def add(cls,
+            date_from: typing.Optional[datetime.datetime],
+            date_to: datetime.datetime,
+            is_full: bool
+            ) -> 'ScrobbleSyncRuns':
+        return cls.create(date_from=date_from, date_to=date_to, is_full=is_full, started=datetime.datetime.now())
+
+    @classmethod
+    def get_unfinished(cls) -> typing.Optional['ScrobbleSyncRuns']:
+        """Returns the latest run that was interrupted before all of its pages were stored."""
+        return cls.select().where(cls.finished.is_null()).order_by(cls.id.desc()).first()
+
+    @classmethod
+    def supersede_unfinished(cls) -> int:
+        """Finishes the interrupted runs, so they are not resumed. Returns their number."""
+        return cls.update(finished=datetime.datetime.now()).where(cls.finished.is_null()).execute()
+
+    @classmethod
+    def get_given_up(cls) -> list['ScrobbleSyncRuns']:
+        """Returns the runs that were finished with pages they failed to store."""
+        return list(cls.select().where(cls.failed_pages.is_null(False)).order_by(cls.id))
+
+    @classmethod
+    def get_high_water_mark(cls) -> typing.Optional[datetime.datetime]:
+        """
+        Returns the date up to which scrobbles are known to be completely stored.
+
+        Databases filled before sync runs were recorded fall back to the newest stored scrobble.
+        """
+        if not cls.select().exists():
+            return Scrobbles.get_last_scrobble_date()
+        return cls.select(fn.MAX(cls.date_to)).where(cls.finished.is_null(False)).scalar()
+
+    def get_stored_pages(self) -> set[int]:
+        return {page for page, in ScrobbleSyncPages.select(ScrobbleSyncPages.page).where(
+            ScrobbleSyncPages.run == self.id
+        ).tuples()}
+
+    def set_total_pages(self, total_pages: int) -> None:
+        self.total_pages = total_pages
+        self.save(only=[ScrobbleSyncRuns.total_pages])
+
+    def get_failed_pages(self) -> list[int]:
+        return [int(page) for page in self.failed_pages.split(',')] if self.failed_pages else []
+
+    def add_attempt(self) -> None:
+        self.attempts += 1
+        self.save(only=[ScrobbleSyncRuns.attempts])
+
+    def mark_as_finished(self, total_pages: int, failed_pages: typing.Iterable[int] = ()) -> None:
+        self.total_pages = total_pages
+        self.failed_pages = ','.join(str(page) for page in sorted(failed_pages)) or None
+        self.finished = datetime.datetime.now()
+        self.save()
+
+
+class ScrobbleSyncPages(BaseModel):
+    """Checkpoints of sync runs: pages whose scrobbles are stored."""
+
+    migration_priority = 1
+
+    id = AutoField()
+    run = ForeignKeyField(ScrobbleSyncRuns, on_delete='CASCADE')
+    page = IntegerField()
+
+    class Meta:
+        indexes = (
+            (('run', 'page'), True),
+        )
+
+    @classmethod
+    def add(cls, run_id: int, page: int) -> None:
+        cls.insert(run=run_id, page=page).on_conflict_ignore().execute()
 
 
 class Log(BaseModel):
@@ -205,10 +763,42 @@ class Log(BaseModel):
     message = CharField()
     level = ForeignKeyField(LogLevel)
 
+    _sink: typing.Optional[LogSink] = None
+    _level_ids: dict[str, int] = {}
+
     @classmethod
-    def add(cls, date: datetime.datetime, message: str, level: str) -> 'Log':
-        return cls.create(
-            date=date,
-            message=message,
-            level=LogLevel.add(level)
-        )
+    def add(cls, date: datetime.datetime, message: str, level: str) -> bool:
+        """Queues the record to be written in background. Returns False if it was dropped."""
+        return cls.get_sink().put(LogRecord(date=date, message=message, level=level))
+
+    @classmethod
+    def add_many(cls, records: list[LogRecord]) -> None:
+        missing = {record.level for record in records} - cls._level_ids.keys()
+        with unit_of_work():
+            if missing:
+                cls._level_ids.update(LogLevel.get_ids(missing))
+            cls.insert_many(
+                [
+                    {'date': record.date, 'message': record.message, 'level': cls._level_ids[record.level]}
+                    for record in records
+                ]
+            ).execute()
+
+    @classmethod
+    def get_sink(cls) -> LogSink:
+        if cls._sink is None:
+            cls._sink = LogSink(
+                write=cls.add_many,
+                queue_size=settings.DataBase.log_queue_size,
+                batch_size=settings.DataBase.log_batch_size,
+                flush_interval=settings.DataBase.log_flush_interval / 1000
+            )
+        return cls._sink
+
+    @classmethod
+    def flush(cls) -> None:
+        """Writes the queued records and stops the background writer."""
+        if cls._sink is not None:
+            cls._sink.close()
+            if cls._sink.dropped:
+                print(f'{cls._sink.dropped} log records were dropped.')
@@ -0,0 +1,59 @@
+import threading
+import typing
+
+from playhouse.pool import MaxConnectionsExceeded, PooledPostgresqlDatabase
+
+
+class PoolStats(typing.NamedTuple):
+    max_connections: int
+    in_use: int
+    idle: int
+    waits: int
+    recycles: int
+
+
+class StatsPooledPostgresqlDatabase(PooledPostgresqlDatabase):
+    """
+    Pool of Postgres connections that counts its waits and recycles.
+
+    A wait is a connection request that found the pool exhausted,
+    a recycle is a connection closed because it outlived "stale_timeout".
+    """
+
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        self._waits = 0
+        self._recycles = 0
+        self._waiting = threading.local()
+        super().__init__(*args, **kwargs)
+
+    def connect(self, reuse_if_open: bool = False) -> bool:
+        self._waiting.value = False
+        return super().connect(reuse_if_open)
+
+    def get_stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                max_connections=self._max_connections,
+                in_use=len(self._in_use),
+                idle=len(self._connections),
+                waits=self._waits,
+                recycles=self._recycles
+            )
+
+    def _connect(self) -> typing.Any:
+        try:
+            return super()._connect()
+        except MaxConnectionsExceeded:
+            if not getattr(self._waiting, 'value', False):
+                self._waiting.value = True
+                with self._lock:
+                    self._waits += 1
+            raise
+
+    def _is_stale(self, timestamp: float) -> bool:
+        is_stale = super()._is_stale(timestamp)
+        if is_stale:
+            # The lock is reentrant, the pool holds it while checking connections out and in.
+            with self._lock:
+                self._recycles += 1
+        return is_stale
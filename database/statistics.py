@@ -0,0 +1,64 @@
+import datetime
+import enum
+import typing
+
+from database.models import AlbumDailyPlays, ArtistDailyPlays
+
+
+class Period(enum.Enum):
+    LAST_7_DAYS = 'last_7_days'
+    LAST_30_DAYS = 'last_30_days'
+    LAST_90_DAYS = 'last_90_days'
+    LAST_365_DAYS = 'last_365_days'
+    THIS_MONTH = 'this_month'
+    THIS_YEAR = 'this_year'
+    ALL_TIME = 'all_time'
+
+    def get_since(self, today: typing.Optional[datetime.date] = None) -> typing.Optional[datetime.date]:
+        """
+        Returns the first day of the period, or None for all time.
+
+        Days are UTC ones, as scrobbles dates and their daily plays are.
+        """
+        today = today or datetime.datetime.now(datetime.timezone.utc).date()
+        match self:
+            case Period.THIS_MONTH:
+                return today.replace(day=1)
+            case Period.THIS_YEAR:
+                return today.replace(month=1, day=1)
+            case Period.ALL_TIME:
+                return None
+        # Rolling periods include today.
+        return today - _ROLLING_PERIODS[self] + datetime.timedelta(days=1)
+
+
+_ROLLING_PERIODS = {
+    Period.LAST_7_DAYS: datetime.timedelta(days=7),
+    Period.LAST_30_DAYS: datetime.timedelta(days=30),
+    Period.LAST_90_DAYS: datetime.timedelta(days=90),
+    Period.LAST_365_DAYS: datetime.timedelta(days=365)
+}
+
+
+class Statistics:
+    """Listening statistics over the daily plays rollups."""
+
+    @staticmethod
+    def get_top_artists(period: Period = Period.ALL_TIME, limit: int = 10) -> list[tuple[str, int]]:
+        return ArtistDailyPlays.get_top(limit=limit, since=period.get_since())
+
+    @staticmethod
+    def get_top_albums(period: Period = Period.ALL_TIME, limit: int = 10) -> list[tuple[str, int]]:
+        return AlbumDailyPlays.get_top(limit=limit, since=period.get_since())
+
+    @staticmethod
+    def get_new_artists(period: Period = Period.THIS_MONTH) -> list[str]:
+        return ArtistDailyPlays.get_new(since=period.get_since() or datetime.date.min)
+
+    @staticmethod
+    def get_new_albums(period: Period = Period.THIS_MONTH) -> list[str]:
+        return AlbumDailyPlays.get_new(since=period.get_since() or datetime.date.min)
+
+    @staticmethod
+    def get_plays_count(period: Period = Period.ALL_TIME) -> int:
+        return ArtistDailyPlays.get_total_plays(since=period.get_since())
@@ -0,0 +1,85 @@
+import collections
+import functools
+import typing
+
+
+def normalize(text: str) -> str:
+    """Case folds the text and collapses whitespaces."""
+    return ' '.join(text.casefold().split())
+
+
+class ArtistMatcher:
+    """
+    Finds artists names in texts with an Aho–Corasick automaton.
+
+    The automaton is built once for the artists list, then every text is scanned in a single pass
+    regardless of the number of artists. Names and texts are compared normalized.
+    """
+
+    def __init__(self, artists: typing.Iterable[str], whole_words: bool = True):
+        self.whole_words = whole_words
+        self._names: list[str] = []
+        self._lengths: list[int] = []
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[int, ...]] = [()]
+        for name in dict.fromkeys(artists):
+            pattern = normalize(name)
+            if pattern:
+                self._add(pattern=pattern, index=len(self._names))
+                self._names.append(name)
+                self._lengths.append(len(pattern))
+        self._build_fail_links()
+
+    def find(self, text: str) -> set[str]:
+        """Returns names of the artists found in the text."""
+        return {self._names[index] for index in self._search(normalize(text))}
+
+    def matches(self, text: str) -> bool:
+        """Checks whether the text contains any artist name."""
+        return next(self._search(normalize(text)), None) is not None
+
+    def _add(self, pattern: str, index: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += (index,)
+
+    def _build_fail_links(self) -> None:
+        queue = collections.deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def _search(self, text: str) -> typing.Iterator[int]:
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._output[state]:
+                if not self.whole_words or self._is_whole_word(text, position - self._lengths[index] + 1, position):
+                    yield index
+
+    @staticmethod
+    def _is_whole_word(text: str, start: int, end: int) -> bool:
+        return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) - 1 or not text[end + 1].isalnum())
+
+
+@functools.lru_cache(maxsize=4)
+def get_artist_matcher(artists: tuple[str, ...], whole_words: bool = True) -> ArtistMatcher:
+    """Returns the matcher for the artists list. Matchers are cached until the list changes."""
+    return ArtistMatcher(artists=artists, whole_words=whole_words)
@@ -1,5 +1,11 @@
+import typing
+
+
 class LastFMResponseError(Exception):
-    pass
+    def __init__(self, *args: typing.Any, status: typing.Optional[int] = None, code: typing.Optional[int] = None):
+        super().__init__(*args)
+        self.status = status
+        self.code = code
 
 
 class KudagoResponseError(Exception):
@@ -1,15 +1,23 @@
 import abc
+import asyncio
 import datetime
+import itertools
+import math
 import time
+import typing
+import urllib.parse
 
-import requests
+import aiohttp
 
 import database as db
 import logger
+import runtime
 import schemas
 import sentry
 import settings
-from getters.errors import LastFMResponseError, KudagoResponseError
+from getters.artist_matcher import get_artist_matcher
+from getters.errors import KudagoResponseError
+from getters.limiters import kudago_limiter
 
 
 class _ProtoGetter:
@@ -38,54 +46,67 @@ class GetterEvents(_ProtoGetter):
             db.Log.add(datetime.datetime.now(), "Failed to get data from API's", 'error')
         return events_list
 
-    def _get_kudago_data(self, url: str, counter: int = 1) -> list[schemas.Event]:
+    def _get_kudago_data(self, url: str) -> typing.Iterator[schemas.Event]:
         """
-        It is a recursive function that takes the URL of the request to the KudaGo API and return data of events.
+        Requests all pages of the KudaGo events list and returns an iterator over their events.
 
         :param url: request URL
-        :return: list of events data
+        :return: events data
         """
-        self.logger.info(f'Request KudaGo API for list of concerts - page {counter}')
-        response = requests.get(url)
+        pages = runtime.Runtime.run(self._get_kudago_pages(url))
+        return itertools.chain.from_iterable(page.results for page in pages)
+
+    async def _get_kudago_pages(self, url: str) -> list[schemas.EventsList]:
+        """Requests the first page for the events count, then the rest of pages concurrently."""
+        session = runtime.Runtime.get_session('kudago')
+        first_page = await self._get_kudago_page(url=url, session=session)
+        page_size = int(urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get('page_size', [0])[0])
+        pages_count = math.ceil(first_page.count / (page_size or len(first_page.results) or 1))
+        self.logger.info(f'Request KudaGo API for list of concerts - {pages_count} pages')
+        results = await asyncio.gather(
+            *(self._get_kudago_page(url=self._set_page(url, number), session=session)
+              for number in range(2, pages_count + 1)),
+            return_exceptions=True
+        )
+        pages = [first_page]
+        for number, result in enumerate(results, start=2):
+            if isinstance(result, BaseException):
+                sentry.capture_exception(result)
+                self.logger.error(f'Failed to get KudaGo events page {number}: {result}')
+            else:
+                pages.append(result)
+        return pages
+
+    async def _get_kudago_page(self, url: str, session: aiohttp.ClientSession) -> schemas.EventsList:
+        await kudago_limiter.acquire()
+        response = await session.request(method='GET', url=url)
+        data = await response.json(content_type=None)
         if not response.ok:
-            error = response.json().get('detail')
-            message = f'Failed to get KudaGo data: {error}'
+            message = f'Failed to get KudaGo data: {data.get("detail")}'
             self.logger.error(message)
             raise KudagoResponseError(message)
-        kudago = schemas.EventsList(**response.json())
-        if not kudago.next:
-            return kudago.results
-        counter += 1
-        return self._get_kudago_data(kudago.next, counter) + kudago.results
+        return schemas.EventsList(**data)
+
+    @staticmethod
+    def _set_page(url: str, number: int) -> str:
+        parts = urllib.parse.urlsplit(url)
+        query = dict(urllib.parse.parse_qsl(parts.query, keep_blank_values=True))
+        query['page'] = str(number)
+        return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
 
     def _get_scrobbled_artists(self) -> list[str]:
         """
-        This method requests API of LastFM for a list of 200 popular artists of the user.
+        Returns the most played artists of the user counted from the stored scrobbles.
 
         :return: list of artists
         """
-        self.logger.info('Request LastFM API for scrobbled artists list')
-        try:
-            response = requests.get(
-                url=settings.APIs.url_top_artists.format(
-                    settings.APIs.lastfm_username,
-                    settings.APIs.lastfm_artists_limit,
-                    settings.APIs.api_key
-                ),
-                timeout=20
-            )
-        except Exception as e:
-            self.logger.error('Failed to get LastFM data')
-            raise e
-        if not response.ok:
-            error = response.json().get('message')
-            message = f'Failed to get LastFM data: {error}'
-            raise LastFMResponseError(message)
-        lastfm = schemas.Artists(**response.json())
-        data = [artist.name for artist in lastfm.topartists.artist]
-        return data
-
-    def _get_events(self, events: list[schemas.Event], artists: list[str]) -> list[schemas.Event]:
+        self.logger.info('Get scrobbled artists list')
+        return db.ArtistPlays.get_top_artists(
+            limit=settings.APIs.lastfm_artists_limit,
+            period_days=settings.APIs.top_artists_period_days
+        )
+
+    def _get_events(self, events: typing.Iterable[schemas.Event], artists: list[str]) -> list[schemas.Event]:
         """
         The function filters passed Events list by the passed list of artists.
 
@@ -94,9 +115,9 @@ class GetterEvents(_ProtoGetter):
         :return: filtered by artist events data
         """
         self.logger.info('Search for required artists in Events list')
-        data: list[schemas.Event] = []
+        matcher = get_artist_matcher(artists=tuple(artists), whole_words=settings.APIs.artist_match_whole_words)
+        data: dict[int, schemas.Event] = {}
         for event in events:
-            for artist in artists:
-                if artist in event.title and event not in data:
-                    data.append(event)
-        return data
+            if event.id not in data and matcher.matches(event.title):
+                data[event.id] = event
+        return list(data.values())
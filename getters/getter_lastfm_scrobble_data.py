@@ -1,153 +1,420 @@
+import array
 import asyncio
 import collections.abc
+import concurrent.futures
 import dataclasses
 import datetime
+import json
+import random
+import sys
 import time
+import typing
 
 import aiohttp
-import requests
 
 import cache
+import database as db
 import logger
+import runtime
 import schemas
 import sentry
 import settings
 from getters.errors import LastFMResponseError
+from getters.limiters import TokenBucket
 
-loop = asyncio.new_event_loop()
-asyncio.set_event_loop(loop)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+# LastFM allows 5 requests per second averaged over 5 minutes per client.
+_limiter = TokenBucket(rate=settings.APIs.lastfm_requests_per_second)
 
-@dataclasses.dataclass
+# LastFM error codes for failures that are worth a retry: operation failed, service offline,
+# service temporarily unavailable and rate limit exceeded.
+_RETRYABLE_ERROR_CODES = {8, 11, 16, 29}
+_RATE_LIMIT_ERROR_CODE = 29
+_BACKOFF_BASE = 1.0
+_BACKOFF_CAP = 60.0
+
+
+def _loads(raw: bytes) -> typing.Any:
+    """Decodes JSON with "orjson" if it is installed."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+@dataclasses.dataclass(slots=True)
 class Scrobble:
     album: str
-    album_mbid: str
     artist: str
-    artist_mbid: str
     date: datetime.datetime
     track: str
-    track_mbid: str
+
+
+class ScrobbleBatch:
+    """
+    Compact column-oriented container of scrobbles.
+
+    Artist, album and track names are interned, so repeated names are stored once,
+    and dates are kept as UTC epoch seconds in an array. Iteration yields "Scrobble" rows.
+    """
+
+    __slots__ = ('artists', 'albums', 'tracks', 'timestamps')
+
+    def __init__(self) -> None:
+        self.artists: list[str] = []
+        self.albums: list[str] = []
+        self.tracks: list[str] = []
+        self.timestamps = array.array('q')
+
+    def append(self, artist: str, album: str, track: str, timestamp: int) -> None:
+        self.artists.append(sys.intern(artist))
+        self.albums.append(sys.intern(album))
+        self.tracks.append(sys.intern(track))
+        self.timestamps.append(timestamp)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: int) -> Scrobble:
+        return Scrobble(
+            album=self.albums[index],
+            artist=self.artists[index],
+            date=datetime.datetime.utcfromtimestamp(self.timestamps[index]),
+            track=self.tracks[index]
+        )
+
+    def __iter__(self) -> collections.abc.Iterator[Scrobble]:
+        for artist, album, track, timestamp in zip(self.artists, self.albums, self.tracks, self.timestamps):
+            yield Scrobble(album=album, artist=artist, date=datetime.datetime.utcfromtimestamp(timestamp), track=track)
 
 
 @dataclasses.dataclass
 class Page:
     number: int
-    scrobbles: list[Scrobble] = dataclasses.field(default_factory=list)
+    scrobbles: ScrobbleBatch = dataclasses.field(default_factory=ScrobbleBatch)
+
+
+@dataclasses.dataclass
+class SyncStats:
+    """Counters of the fetch and write stages of a scrobbles synchronisation."""
+
+    total_pages: int = 0
+    pages_fetched: int = 0
+    rows_inserted: int = 0
+    rows_skipped: int = 0
+    retries: int = 0
+    throttled: int = 0
+    fetch_time: float = 0.0
+    write_time: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages_fetched / self.fetch_time if self.fetch_time else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return (self.rows_inserted + self.rows_skipped) / self.write_time if self.write_time else 0.0
 
 
 class LastFMScrobbleDataGetter:
 
     def __init__(self):
-        self._pages_for_retry = []
+        self._failed_pages = []
         self.logger = logger.Logger(name=self.__class__.__name__)
 
-    def get_scrobbles(self):
+    def get_scrobbles(self, full_resync: bool = False):
+        """
+        Stores scrobbles made since the last finished synchronisation run.
+
+        :param full_resync: download the whole scrobbles history instead of the new scrobbles only
+        """
         try:
             self.logger.info('Getting data...')
             start = time.time()
-            self.logger.info('Start DB update...')
-            for page in self._get_pages():
-                for scrobble in page.scrobbles:
-                    cache.Caching.get_scrobble_id(
-                        track=scrobble.track,
-                        artist=scrobble.artist,
-                        album=scrobble.album,
-                        scrobble_date=scrobble.date
-                    )
-            self.logger.success(f'DB update finished with {round(time.time() - start, 2)} seconds.')
+            run, stored_pages = self._get_run(full_resync=full_resync)
+            self.logger.info(f'Start DB update{f" with scrobbles since {run.date_from}" if run.date_from else ""}...')
+            stats = runtime.Runtime.run(self._sync(run=run, stored_pages=stored_pages))
+            if self._failed_pages:
+                self.logger.error(f'Pages failed to be stored: {sorted(self._failed_pages)}')
+            else:
+                run.mark_as_finished(total_pages=stats.total_pages)
+            self.logger.success(
+                f'DB update finished with {round(time.time() - start, 2)} seconds: '
+                f'{stats.rows_inserted} scrobbles inserted, {stats.rows_skipped} skipped; '
+                f'{stats.retries} requests retried, {stats.throttled} throttled; '
+                f'fetched {round(stats.pages_per_second, 2)} pages/s, written {round(stats.rows_per_second, 2)} rows/s.'
+            )
+            self.logger.info(f'Dictionaries caches: {cache.Caching.get_stats()}')
         except Exception as e:
             sentry.capture_exception(e)
             self.logger.error(f'Error during getting data: {e}', stack_info=True)
 
-    def _get_pages(self) -> list[Page]:
-        self.logger.info('Getting scrobbles from LastFM...')
-        max_page_number = self._get_total_pages_count()
-        results = loop.run_until_complete(self._make_requests(range(1, max_page_number + 1)))
-        if self._pages_for_retry:
-            count = 5
-            while count > 0:
-                self.logger.info(f'Trying to reload failed pages. {count} tries left.')
-                results += loop.run_until_complete(self._make_requests(self._pages_for_retry))
-                count -= 1
-        if self._pages_for_retry:
-            self.logger.error('There are still not get pages!')
-        self.logger.success('Getting info finished!')
-        return [result for result in results if result is not None]
+    def refetch_failed_pages(self) -> None:
+        """
+        Stores scrobbles of the pages that given up runs failed to store.
 
-    def _get_total_pages_count(self):
-        """Gets the total number of pages to download with scrobbling from the first page of the scrobbling request."""
-        response = requests.get(
-            settings.APIs.url_recent_tracks.format(
-                user=settings.APIs.lastfm_username,
-                api_key=settings.APIs.api_key
+        The dates ranges of the runs are pinned, so their pages still hold the same scrobbles.
+        Pages that fail again stay recorded in the runs for the next try.
+        """
+        try:
+            for run in db.ScrobbleSyncRuns.get_given_up():
+                failed_pages = set(run.get_failed_pages())
+                self.logger.info(f'Refetch pages {sorted(failed_pages)} of run {run.id}...')
+                self._failed_pages = []
+                stats = runtime.Runtime.run(
+                    self._sync(run=run, stored_pages=set(range(1, run.total_pages + 1)) - failed_pages)
+                )
+                run.mark_as_finished(total_pages=stats.total_pages, failed_pages=self._failed_pages)
+                if self._failed_pages:
+                    self.logger.error(f'Pages of run {run.id} failed to be stored: {sorted(self._failed_pages)}')
+                else:
+                    self.logger.success(f'Pages of run {run.id} are stored: {stats.rows_inserted} scrobbles inserted')
+        except Exception as e:
+            sentry.capture_exception(e)
+            self.logger.error(f'Error during refetching failed pages: {e}', stack_info=True)
+
+    def _get_run(self, full_resync: bool) -> tuple[db.ScrobbleSyncRuns, set[int]]:
+        """
+        Returns the run to sync with its already stored pages.
+
+        The interrupted run is resumed up to "lastfm_sync_attempts_limit" attempts. Then it is finished
+        with the pages it failed to store, so the next runs start from its end and do not get stuck on it.
+        A full resync supersedes the interrupted runs instead, so they are not resumed after it.
+        """
+        if full_resync:
+            superseded = db.ScrobbleSyncRuns.supersede_unfinished()
+            if superseded:
+                self.logger.info(f'{superseded} interrupted runs are superseded by the full resync')
+        run = None if full_resync else db.ScrobbleSyncRuns.get_unfinished()
+        if run is not None and run.attempts >= settings.APIs.lastfm_sync_attempts_limit:
+            failed_pages = set(range(1, run.total_pages + 1)) - run.get_stored_pages()
+            run.mark_as_finished(total_pages=run.total_pages, failed_pages=failed_pages)
+            self.logger.error(
+                f'Run {run.id} was given up after {run.attempts} attempts, pages failed to be stored: '
+                f'{sorted(failed_pages)}. Run the resync with "--failed-pages" to get their scrobbles.'
             )
+            run = None
+        if run is None:
+            date_from = None if full_resync else db.ScrobbleSyncRuns.get_high_water_mark()
+            run = db.ScrobbleSyncRuns.add(date_from=date_from, date_to=datetime.datetime.utcnow(), is_full=full_resync)
+            return run, set()
+        run.add_attempt()
+        stored_pages = run.get_stored_pages()
+        self.logger.info(
+            f'Resume interrupted run {run.id} with {len(stored_pages)} pages already stored, attempt {run.attempts}'
         )
-        if not response.ok:
-            error_msg = self._get_response_error_message(response)
-            raise LastFMResponseError(error_msg)
-        data = schemas.ScrobbleData(**response.json())
-        return int(data.recenttracks.attr.totalPages)
-
-    def _get_response_error_message(self, response: requests.models.Response) -> str:
-        error_msg = ''
+        return run, stored_pages
+
+    async def _sync(self, run: db.ScrobbleSyncRuns, stored_pages: set[int]) -> SyncStats:
+        """
+        Streams scrobbles pages of the run from LastFM into the DB.
+
+        Pages are passed to the writer through a bounded queue as soon as they are fetched,
+        so no more than "lastfm_pages_in_flight" pages are held in memory at once.
+        Every written page is checkpointed, and the passed already stored pages are not requested again.
+        The dates range of the run is pinned, so pages numbers keep pointing to the same scrobbles.
+        """
+        self.logger.info('Getting scrobbles from LastFM...')
+        session = runtime.Runtime.get_session('lastfm')
+        total_pages = await self._get_total_pages_count(date_from=run.date_from, date_to=run.date_to, session=session)
+        stats = SyncStats(total_pages=total_pages)
+        # DB calls are blocking, so they run in a separate thread to let fetching go on meanwhile.
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='ScrobblesWriter')
+        running_loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[typing.Optional[Page]] = asyncio.Queue(maxsize=settings.APIs.lastfm_pages_in_flight)
+        writer = asyncio.create_task(self._write_pages(run=run, queue=queue, stats=stats, executor=executor))
         try:
-            error_msg = response.json()
-        except Exception as e:
-            self.logger.failure(f'Failure on attempt to extract error data from response: {e}', stack_info=True)
-        else:
-            error_msg = f'Response error message: {error_msg}'
-        return error_msg
-
-    async def _make_requests(self, pages_numbers: collections.abc.Iterable):
-        # Limit the number of connections to 10.
-        connector = aiohttp.TCPConnector(limit=5)
-        async with aiohttp.ClientSession(connector=connector) as session:
-            tasks = []
-            for page_number in pages_numbers:
-                url = settings.APIs.url_recent_tracks_via_page.format(
+            await running_loop.run_in_executor(executor, run.set_total_pages, total_pages)
+            await self._fetch_pages(
+                (number for number in range(1, total_pages + 1) if number not in stored_pages),
+                run.date_from,
+                run.date_to,
+                queue=queue,
+                stats=stats,
+                session=session
+            )
+        finally:
+            await queue.put(None)
+            await writer
+            # The writer thread holds its own connection for the whole run.
+            await running_loop.run_in_executor(executor, db.close_connection)
+            executor.shutdown()
+        self.logger.success('Getting info finished!')
+        return stats
+
+    async def _fetch_pages(self,
+                           pages_numbers: collections.abc.Iterable[int],
+                           date_from: typing.Optional[datetime.datetime],
+                           date_to: datetime.datetime,
+                           queue: asyncio.Queue,
+                           stats: SyncStats,
+                           session: aiohttp.ClientSession) -> None:
+        start = time.time()
+        numbers = iter(pages_numbers)
+        # One worker per pooled connection.
+        results = await asyncio.gather(
+            *(self._fetch_worker(numbers, date_from, date_to, queue=queue, stats=stats, session=session)
+              for _ in range(settings.Http.lastfm_connections_limit)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                sentry.capture_exception(result)
+                self.logger.error(f'Pages fetching worker failed: {result}')
+        stats.fetch_time += time.time() - start
+
+    async def _fetch_worker(self,
+                            numbers: collections.abc.Iterator[int],
+                            date_from: typing.Optional[datetime.datetime],
+                            date_to: datetime.datetime,
+                            queue: asyncio.Queue,
+                            stats: SyncStats,
+                            session: aiohttp.ClientSession) -> None:
+        """Fetches pages one by one while there are page numbers left and passes them to the writer."""
+        for page_number in numbers:
+            url = self._set_date_range(
+                url=settings.APIs.url_recent_tracks_via_page.format(
                     page=page_number,
                     user=settings.APIs.lastfm_username,
                     api_key=settings.APIs.api_key
-                )
-                try:
-                    tasks.append(self._get_page_data(url=url, number=page_number, session=session))
-                    if page_number in self._pages_for_retry:
-                        self._pages_for_retry.remove(page_number)
-                except Exception as e:
+                ),
+                date_from=date_from,
+                date_to=date_to
+            )
+            page = await self._get_page_with_retries(url=url, number=page_number, session=session, stats=stats)
+            if page is None:
+                self._failed_pages.append(page_number)
+                continue
+            stats.pages_fetched += 1
+            await queue.put(page)
+
+    async def _get_page_with_retries(self,
+                                     url: str,
+                                     number: int,
+                                     session: aiohttp.ClientSession,
+                                     stats: SyncStats) -> typing.Optional[Page]:
+        """
+        Requests the page under the shared rate limit.
+
+        Throttled and transient failures are retried with exponential backoff and full jitter
+        up to "lastfm_retry_limit" times. Returns None if the page could not be got.
+        """
+        attempt = 0
+        while True:
+            await _limiter.acquire()
+            try:
+                page = await self._get_page_data(url=url, number=number, session=session)
+            except Exception as e:
+                if not self._is_retryable(e) or attempt >= settings.APIs.lastfm_retry_limit:
                     sentry.capture_exception(e)
                     self.logger.error(f'Failed to get LastFM data from {url}, error: {e}', stack_info=True)
-                    if page_number not in self._pages_for_retry:
-                        self._pages_for_retry.append(page_number)
-            result = await asyncio.gather(*tasks)
+                    return None
+                attempt += 1
+                stats.retries += 1
+                delay = random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** attempt))
+                if isinstance(e, LastFMResponseError) and (e.status == 429 or e.code == _RATE_LIMIT_ERROR_CODE):
+                    stats.throttled += 1
+                    _limiter.throttle(delay)
+                self.logger.warning(f'Page {number} request failed ({e}), retry {attempt} in {round(delay, 2)} s.')
+                await asyncio.sleep(delay)
+            else:
+                _limiter.succeed()
+                return page
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, LastFMResponseError):
+            return error.status == 429 or (error.status or 0) >= 500 or error.code in _RETRYABLE_ERROR_CODES
+        return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+    async def _write_pages(self,
+                           run: db.ScrobbleSyncRuns,
+                           queue: asyncio.Queue,
+                           stats: SyncStats,
+                           executor: concurrent.futures.Executor) -> None:
+        """Writes fetched pages into the DB with the passed executor until the "None" sentinel is received."""
+        running_loop = asyncio.get_running_loop()
+        while (page := await queue.get()) is not None:
+            start = time.time()
+            try:
+                result = await running_loop.run_in_executor(executor, self._store_page, run, page)
+            except Exception as e:
+                sentry.capture_exception(e)
+                self.logger.error(f'Failed to write page {page.number} into DB, error: {e}', stack_info=True)
+                if page.number not in self._failed_pages:
+                    self._failed_pages.append(page.number)
+            else:
+                stats.rows_inserted += result.inserted
+                stats.rows_skipped += result.skipped
+            stats.write_time += time.time() - start
+
+    @staticmethod
+    def _store_page(run: db.ScrobbleSyncRuns, page: Page) -> db.IngestResult:
+        result = db.Scrobbles.add_many(page.scrobbles)
+        db.ScrobbleSyncPages.add(run_id=run.id, page=page.number)
         return result
 
+    async def _get_total_pages_count(self,
+                                     date_from: typing.Optional[datetime.datetime],
+                                     date_to: datetime.datetime,
+                                     session: aiohttp.ClientSession) -> int:
+        """Gets the total number of pages to download with scrobbling from the first page of the scrobbling request."""
+        url = settings.APIs.url_recent_tracks.format(
+            user=settings.APIs.lastfm_username,
+            api_key=settings.APIs.api_key
+        )
+        await _limiter.acquire()
+        data = await self._send_request(url=self._set_date_range(url, date_from, date_to), session=session)
+        return int(schemas.ScrobbleData(**data).recenttracks.attr.totalPages)
+
+    @staticmethod
+    def _set_date_range(url: str, date_from: typing.Optional[datetime.datetime], date_to: datetime.datetime) -> str:
+        """Limits the scrobbles request by the passed UTC dates with "from" and "to" parameters of LastFM API."""
+        if date_from is not None:
+            url += f'&from={int(date_from.replace(tzinfo=datetime.timezone.utc).timestamp())}'
+        return f'{url}&to={int(date_to.replace(tzinfo=datetime.timezone.utc).timestamp())}'
+
     async def _get_page_data(self, url: str, number: int, session: aiohttp.ClientSession) -> Page:
         """
         This function gets data from single page.
         """
         data = await self._send_request(url=url, session=session)
-        scrobbles = schemas.ScrobbleData(**data)
+        return self._parse_page(data=data, number=number, strict=settings.APIs.lastfm_strict_validation)
+
+    @staticmethod
+    def _parse_page(data: dict, number: int, strict: bool = False) -> Page:
+        """
+        Builds the page from the decoded response.
+
+        By default only the fields needed for scrobbles are validated,
+        strict mode validates the whole response against "schemas.ScrobbleData".
+        """
+        scheme = schemas.ScrobbleData if strict else schemas.LeanScrobbleData
+        scrobbles = scheme.model_validate(data)
         page = Page(number)
         for scrobble in scrobbles.recenttracks.tracks:
             if scrobble.nowplaying:  # If track is playing now it has no scrobble date yet.
                 continue
             page.scrobbles.append(
-                Scrobble(
-                    album=scrobble.album.text,
-                    album_mbid=scrobble.album.mbid,
-                    artist=scrobble.artist.text,
-                    artist_mbid=scrobble.artist.mbid,
-                    date=datetime.datetime.utcfromtimestamp(int(scrobble.date.uts)),
-                    track=scrobble.name,
-                    track_mbid=scrobble.mbid
-                )
+                artist=scrobble.artist.text,
+                album=scrobble.album.text,
+                track=scrobble.name,
+                timestamp=int(scrobble.date.uts)
             )
         return page
 
     async def _send_request(self, url: str, session: aiohttp.ClientSession):
         response = await session.request(method="GET", url=url)
-        if not response.ok:
-            error = await response.json()
-            self.logger.error(f'Error: {error}')
-            raise LastFMResponseError(error)
-        return await response.json()
+        try:
+            data = _loads(await response.read())
+        except ValueError:
+            data = None
+        if not response.ok or not isinstance(data, dict) or 'error' in data:
+            self.logger.error(f'Error: {data}')
+            raise LastFMResponseError(
+                data,
+                status=response.status,
+                code=data.get('error') if isinstance(data, dict) else None
+            )
+        return data
@@ -1,21 +1,62 @@
 import asyncio
-import time
+import datetime
+import threading
+import typing
 
 import aiohttp
 import pydantic
 
+import database as db
+import runtime
+import settings
 from getters.errors import KudagoResponseError
 from getters.getter_events import _ProtoGetter
+from getters.limiters import kudago_limiter
 
 
 class PlaceDetails(pydantic.BaseModel):
     address: str
     id: int
     title: str
+    fetched: typing.Optional[datetime.datetime] = pydantic.Field(default_factory=datetime.datetime.now)
 
 
-loop = asyncio.new_event_loop()
-asyncio.set_event_loop(loop)
+class PlacesCache:
+    """
+    Process-wide read-through cache of places details.
+
+    It is filled from "db.Places" on the first use, then with details fetched from KudaGo.
+    Entries fetched more than "place_details_ttl" seconds ago are treated as missing,
+    the stored ones are aged by the time they were fetched, so restarts do not refresh them.
+    """
+
+    _places: dict[int, PlaceDetails] = {}
+    _is_loaded = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_many(cls, places_ids: list[int], fresh_only: bool = True) -> dict[int, PlaceDetails]:
+        """Returns details of the known places among the passed ones."""
+        with cls._lock:
+            if not cls._is_loaded:
+                cls._load()
+            places = [cls._places[place_id] for place_id in places_ids if place_id in cls._places]
+            if fresh_only:
+                expired = datetime.datetime.now() - datetime.timedelta(seconds=settings.App.place_details_ttl)
+                places = [place for place in places if place.fetched is not None and place.fetched > expired]
+            return {place.id: place for place in places}
+
+    @classmethod
+    def put_many(cls, places: list[PlaceDetails]) -> None:
+        with cls._lock:
+            cls._places.update((place.id, place) for place in places)
+
+    @classmethod
+    def _load(cls) -> None:
+        query = db.Places.select(db.Places.place_id, db.Places.address, db.Places.title, db.Places.fetched).tuples()
+        for place_id, address, title, fetched in query:
+            cls._places[place_id] = PlaceDetails(id=place_id, address=address, title=title, fetched=fetched)
+        cls._is_loaded = True
 
 
 # noinspection PyBroadException
@@ -27,51 +68,57 @@ class GetterPlaceDetails(_ProtoGetter):
 
     def get_data(self) -> list[PlaceDetails]:
         self.logger.info('Get details for events places')
-        results = self._get_places_data(self.places_ids)
+        cached = PlacesCache.get_many(self.places_ids)
+        missing = [place_id for place_id in self.places_ids if place_id not in cached]
+        self.logger.info(f'Places details cache: {len(cached)} hits, {len(missing)} misses')
+        fetched = runtime.Runtime.run(self._get_places_data(missing)) if missing else []
+        PlacesCache.put_many(fetched)
+        result = list(cached.values()) + fetched
         if self._ids_for_retry:
-            count = 5
-            while count > 0:
-                results += self._get_places_data(self._ids_for_retry)
-                count -= 1
-        return [PlaceDetails(**result) for result in results if result is not None]
-
-    def _get_places_data(self, places_ids: list[int]):
-        results = []
-        chunks = [places_ids[x:x + 6] for x in range(0, len(places_ids), 6)]
-
-        for chunk in chunks:  # We can make only 6 requests per second to KudaGo API.
-            results += loop.run_until_complete(self._make_requests(places_ids=chunk))
-            time.sleep(1)
-        return results
-
-    async def _make_requests(self, places_ids: list[int]):
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for place_id in places_ids:
-                tasks.append(self._get_place_details(place_id=place_id, session=session))
-            result = await asyncio.gather(*tasks)
+            # Expired details are still better than none if they failed to be refreshed.
+            result += PlacesCache.get_many(self._ids_for_retry, fresh_only=False).values()
         return result
 
-    async def _get_place_details(self, place_id: int, session: aiohttp.ClientSession):
-        result = None
+    async def _get_places_data(self, places_ids: list[int]) -> list[PlaceDetails]:
+        """
+        Requests details of the places under the shared KudaGo rate limit.
+
+        Only the failed places are requested again, until none are left or retries are exhausted.
+        """
+        session = runtime.Runtime.get_session('kudago')
+        results: list[PlaceDetails] = []
+        self._ids_for_retry = list(places_ids)
+        count = 5
+        while self._ids_for_retry:
+            responses = await asyncio.gather(
+                *(self._get_place_details(place_id=place_id, session=session) for place_id in self._ids_for_retry)
+            )
+            results += [PlaceDetails(**response) for response in responses if response is not None]
+            self._ids_for_retry = [
+                place_id for place_id, response in zip(self._ids_for_retry, responses) if response is None
+            ]
+            if count == 0:
+                break
+            count -= 1
+        if self._ids_for_retry:
+            self.logger.error(f'Failed to get details of places: {self._ids_for_retry}')
+        return results
+
+    async def _get_place_details(self, place_id: int, session: aiohttp.ClientSession) -> typing.Optional[dict]:
         url = f'https://kudago.com/public-api/v1.4/places/{place_id}/?lang=&fields=id,title,address&location=msk'
+        await kudago_limiter.acquire()
         try:
-            result = await self._send_request(url=url, session=session)
-            if place_id in self._ids_for_retry:
-                self._ids_for_retry.remove(place_id)
+            return await self._send_request(url=url, session=session)
         except KudagoResponseError:
-            if place_id not in self._ids_for_retry:
-                self._ids_for_retry.append(place_id)
+            return None
         except Exception:
             self.logger.error(f'Failed to get KudaGo data from {url}')
-            if place_id not in self._ids_for_retry:
-                self._ids_for_retry.append(place_id)
-        return result
+            return None
 
     async def _send_request(self, url: str, session: aiohttp.ClientSession):
         response = await session.request(method="GET", url=url)
         if not response.status == 200:
-            error = await response.json()
+            error = await response.json(content_type=None)
             self.logger.error(f'Failed to get KudaGo data from {url}: {error.get("detail")}')
             raise KudagoResponseError
         return await response.json()
@@ -0,0 +1,104 @@
+import asyncio
+import collections
+import time
+import typing
+
+
+class _LoopLock:
+    """
+    Holder of an asyncio lock that is recreated for every event loop it is used in.
+
+    Limiters are module-level objects, while a lock is bound to the loop it first waits in,
+    so a lock created before the shared loop was restarted would fail in the new one.
+    """
+
+    def __init__(self) -> None:
+        self._lock: typing.Optional[asyncio.Lock] = None
+        self._loop: typing.Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        return self._lock
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket limiter.
+
+    The rate is halved every time the upstream throttles the requests and then gradually restored
+    back to the nominal one with every successful request.
+    """
+
+    def __init__(self, rate: float, capacity: typing.Optional[int] = None, min_rate: float = 0.5):
+        self.nominal_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity or max(int(rate), 1)
+        self.throttled = 0
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = _LoopLock()
+
+    async def acquire(self) -> None:
+        """Waits until a request is allowed to be sent."""
+        async with self._lock.get():
+            while True:
+                now = self._refill()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def throttle(self, delay: float) -> None:
+        """Pauses the requests for the passed number of seconds and lowers the rate."""
+        self.throttled += 1
+        self.rate = max(self.rate / 2, self.min_rate)
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def succeed(self) -> None:
+        """Moves the lowered rate back towards the nominal one."""
+        self.rate = min(self.rate + self.nominal_rate / 10, self.nominal_rate)
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._updated) * self.rate, float(self.capacity))
+        self._updated = now
+        return now
+
+
+class SlidingWindowLimiter:
+    """
+    Asynchronous limiter that allows at most "max_calls" calls within any "period" seconds.
+
+    Unlike waiting for a whole bunch of requests and sleeping, a slot is freed as soon as the oldest
+    call leaves the window, so requests are kept in flight continuously.
+    """
+
+    def __init__(self, max_calls: int, period: float = 1.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls: collections.deque[float] = collections.deque()
+        self._lock = _LoopLock()
+
+    async def acquire(self) -> None:
+        """Waits until a request is allowed to be sent."""
+        async with self._lock.get():
+            while True:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                await asyncio.sleep(self.period - (now - self._calls[0]))
+
+
+# KudaGo allows 6 requests per second.
+kudago_limiter = SlidingWindowLimiter(max_calls=6, period=1.0)
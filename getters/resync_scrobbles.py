@@ -0,0 +1,39 @@
+"""
+Synchronises the whole LastFM scrobbles history.
+
+Usage:
+    python -m getters.resync_scrobbles [--local] [--failed-pages]
+
+Regular synchronisation runs fetch only the scrobbles made since the last finished run.
+The full resync downloads the whole history again, interrupted runs are superseded by it.
+With "--failed-pages" only the pages that given up runs failed to store are fetched again.
+"""
+
+import argparse
+
+import database as db
+import runtime
+from getters.getter_lastfm_scrobble_data import LastFMScrobbleDataGetter
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--local', action='store_true', help='use the local SQLite database')
+    parser.add_argument(
+        '--failed-pages', action='store_true', help='refetch the pages failed by given up runs only'
+    )
+    args = parser.parse_args()
+
+    db.initialize_data_base(is_local=args.local)
+    try:
+        with db.unit_of_work():
+            if args.failed_pages:
+                LastFMScrobbleDataGetter().refetch_failed_pages()
+            else:
+                LastFMScrobbleDataGetter().get_scrobbles(full_resync=True)
+    finally:
+        runtime.Runtime.shutdown()
+
+
+if __name__ == '__main__':
+    main()
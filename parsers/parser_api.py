@@ -1,4 +1,9 @@
+import contextlib
 import datetime
+import hashlib
+import json
+import time
+import typing
 
 import database as db
 import getters
@@ -23,31 +28,23 @@ class ParserApi:
     def _exec_scan(self) -> bool:
         result = False
         try:
-            events: list[schemas.Event] | None = getters.GetterEvents().get_data()
+            with self._timed('Get events'):
+                events: list[schemas.Event] | None = getters.GetterEvents().get_data()
             if events:
                 places_ids = list({event.place.id for event in events if event.place})
-                places: list[PlaceDetails] = getters.GetterPlaceDetails(places_ids).get_data()
+                with self._timed('Get places'):
+                    places: list[PlaceDetails] = getters.GetterPlaceDetails(places_ids).get_data()
 
-                self.logger.info('Filter events')
-                for event in events:
-                    if not self._check_place_is_present(event=event, places=places):
-                        events.remove(event)
+                with self._timed('Filter events'):
+                    places_by_id = {place.id: place for place in places}
+                    events = [event for event in events if event.place and event.place.id in places_by_id]
 
-                self.logger.info('Add places to DB')
-                for place in places:
-                    db.Places.add(place_id=place.id, address=place.address, title=place.title)
-
-                self.logger.info('Add events to DB')
-                for event in events:
-                    db.Events.add(
-                        event_id=event.id,
-                        title=event.title,
-                        slug=event.slug,
-                        place_id=event.place.id if event.place else None,
-                        price=event.price
+                with self._timed('Store places and events'), db.atomic():
+                    db.Places.add_many(
+                        {'place_id': place.id, 'address': place.address, 'title': place.title, 'fetched': place.fetched}
+                        for place in places_by_id.values()
                     )
-                    for date in event.dates:
-                        db.EventDates.add(event_id=event.id, date_start=date.start, date_stop=date.end)
+                    self._store_events(events)
                 result = True
         except Exception as e:
             sentry.capture_exception(e)
@@ -55,13 +52,51 @@ class ParserApi:
             db.Log.add(datetime.datetime.now(), f'Error occurred during APIs parsing: {e}', 'critical')
         return result
 
+    @contextlib.contextmanager
+    def _timed(self, phase: str) -> typing.Iterator[None]:
+        started = time.perf_counter()
+        self.logger.info(phase)
+        yield
+        self.logger.info(f'{phase} took {time.perf_counter() - started:.2f} s')
+
+    def _store_events(self, events: list[schemas.Event]) -> None:
+        """
+        Adds new events and rewrites the changed ones, the unchanged events are not touched.
+
+        Changes are detected by comparing content hashes with the stored ones.
+        Changed events are marked as updated and not sent, so they are sent again.
+        """
+        hashes = {event.id: self._get_content_hash(event) for event in events}
+        stored_hashes = db.EventHashes.get_hashes(hashes.keys())
+        new_events = {event.id: event for event in events if event.id not in stored_hashes}
+        changed_events = {
+            event.id: event for event in events
+            if event.id in stored_hashes and stored_hashes[event.id] != hashes[event.id]
+        }
+        self.logger.info(
+            f'Events: {len(new_events)} new, {len(changed_events)} changed, '
+            f'{len(hashes) - len(new_events) - len(changed_events)} unchanged'
+        )
+
+        db.Events.add_many(self._get_event_row(event) for event in new_events.values())
+        db.Events.add_many((self._get_event_row(event) for event in changed_events.values()), updated=True)
+        db.EventDates.replace_many({
+            event_id: [(date.start, date.end) for date in event.dates]
+            for event_id, event in (new_events | changed_events).items()
+        })
+        db.EventHashes.set_hashes({event_id: hashes[event_id] for event_id in new_events | changed_events})
+
+    @staticmethod
+    def _get_event_row(event: schemas.Event) -> dict:
+        return {
+            'event_id': event.id,
+            'title': event.title,
+            'slug': event.slug,
+            'place_id': event.place.id if event.place else None,
+            'price': event.price
+        }
+
     @staticmethod
-    def _check_place_is_present(event: schemas.Event, places: list[PlaceDetails]) -> bool:
-        is_present = False
-        for place in places:
-            if event.place:
-                if event.place.id == place.id:
-                    is_present = True
-                if not event.place.id:
-                    is_present = True
-        return is_present
+    def _get_content_hash(event: schemas.Event) -> str:
+        content = event.model_dump(mode='json', include={'title', 'slug', 'place', 'price', 'dates'})
+        return hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()
@@ -0,0 +1,5 @@
+__all__ = [
+    'Runtime'
+]
+
+from .runtime import Runtime
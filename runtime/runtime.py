@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import typing
+
+import aiohttp
+
+import logger
+import settings
+
+T = typing.TypeVar('T')
+
+
+class Runtime:
+    """
+    Holds the single event loop of the process and HTTP sessions shared by getters.
+
+    The loop runs forever in a dedicated daemon thread, so worker threads submit coroutines into it
+    instead of running their own loops. Sessions keep pooled keep-alive connections per upstream.
+    """
+
+    _loop: typing.Optional[asyncio.AbstractEventLoop] = None
+    _thread: typing.Optional[threading.Thread] = None
+    _sessions: dict[str, aiohttp.ClientSession] = {}
+    _lock = threading.Lock()
+    _logger = logger.Logger(name='Runtime')
+
+    @classmethod
+    def get_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._lock:
+            if cls._loop is None:
+                cls._loop = asyncio.new_event_loop()
+                cls._thread = threading.Thread(target=cls._loop.run_forever, name='RuntimeLoop', daemon=True)
+                cls._thread.start()
+                cls._logger.info('Event loop started')
+        return cls._loop
+
+    @classmethod
+    def run(cls, coroutine: typing.Coroutine[typing.Any, typing.Any, T]) -> T:
+        """Runs the coroutine in the shared event loop and blocks the calling thread until it is done."""
+        return asyncio.run_coroutine_threadsafe(coroutine, cls.get_loop()).result()
+
+    @classmethod
+    def get_session(cls, upstream: str) -> aiohttp.ClientSession:
+        """
+        Returns the pooled session of the upstream ("lastfm" or "kudago").
+
+        Must be called from a coroutine running in the shared event loop.
+        """
+        session = cls._sessions.get(upstream)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=getattr(settings.Http, f'{upstream}_connections_limit'),
+                ttl_dns_cache=settings.Http.dns_cache_ttl,
+                keepalive_timeout=settings.Http.keepalive_timeout
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.Http.request_timeout)
+            )
+            cls._sessions[upstream] = session
+        return session
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Closes the sessions and stops the event loop."""
+        with cls._lock:
+            loop, cls._loop = cls._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(cls._close_sessions(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        cls._thread.join()
+        loop.close()
+        cls._logger.info('Event loop stopped')
+
+    @classmethod
+    async def _close_sessions(cls) -> None:
+        sessions, cls._sessions = cls._sessions, {}
+        for session in sessions.values():
+            await session.close()
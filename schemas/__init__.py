@@ -2,8 +2,9 @@ __all__ = [
     'Artists',
     'Event',
     'EventsList',
+    'LeanScrobbleData',
     'ScrobbleData'
 ]
 
 from .scheme_getter_events import Artists, Event, EventsList
-from .scheme_getter_lastfm_scrobble_data import ScrobbleData
+from .scheme_getter_lastfm_scrobble_data import LeanScrobbleData, ScrobbleData
@@ -57,3 +57,31 @@ class RecentTracks(pydantic.BaseModel):
 
 class ScrobbleData(pydantic.BaseModel):
     recenttracks: RecentTracks
+
+
+class _LeanElement(pydantic.BaseModel):
+    mbid: str = ''
+    text: str = pydantic.Field(..., alias='#text')
+
+
+class _LeanDate(pydantic.BaseModel):
+    uts: str
+
+
+class _LeanTrack(pydantic.BaseModel):
+    """Track with the fields of a scrobble only. Other fields of the response are skipped."""
+
+    artist: _LeanElement
+    album: _LeanElement
+    mbid: str = ''
+    name: str
+    nowplaying: typing.Optional[_Attr] = pydantic.Field(None, alias='@attr')
+    date: typing.Optional[_LeanDate] = None
+
+
+class _LeanRecentTracks(pydantic.BaseModel):
+    tracks: list[_LeanTrack] = pydantic.Field(..., alias='track')
+
+
+class LeanScrobbleData(pydantic.BaseModel):
+    recenttracks: _LeanRecentTracks
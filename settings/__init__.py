@@ -3,6 +3,7 @@ __all__ = [
     'APIs',
     'App',
     'DataBase',
+    'Http',
     'Redis'
 ]
 
@@ -10,4 +11,5 @@ from .settings import APIs
 from .settings import App
 from .settings import check_config_integrity
 from .settings import DataBase
+from .settings import Http
 from .settings import Redis
@@ -1,6 +1,6 @@
 import os
 
-from configorm import IntegerField, StringField, Section, IniConnector
+from configorm import BooleanField, IntegerField, StringField, Section, IniConnector
 
 
 connector = IniConnector(connection_string=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'cpb-config.ini'))
@@ -17,12 +17,18 @@ class BaseSection(Section):
 
 class APIs(BaseSection):
     kudago_url = StringField(default='https://kudago.com/public-api/v1.4/events/?lang=&page_size=100&fields=id,dates,title,place,slug,price&expand=&order_by=&text_format=&ids=&location=msk&actual_since={}&actual_until=&is_free=&categories=concert')  # noqa: E501
-    url_top_artists = StringField(default='http://ws.audioscrobbler.com/2.0/?method=user.gettopartists&user={user}&period=overall&limit={}&api_key={api_key}&format=json')  # noqa: E501
     url_recent_tracks = StringField(default='http://ws.audioscrobbler.com/2.0/?method=user.getrecenttracks&limit=200&user={user}&api_key={api_key}&format=json') # noqa: E501
     url_recent_tracks_via_page = StringField(default='http://ws.audioscrobbler.com/2.0/?method=user.getrecenttracks&limit=200&page={page}&user={user}&api_key={api_key}&format=json')  # noqa: E501
     lastfm_username = StringField(null=True)
     api_key = StringField(null=True)
     lastfm_artists_limit = IntegerField(default=300)
+    top_artists_period_days = IntegerField(null=True)
+    artist_match_whole_words = BooleanField(default=True)
+    lastfm_pages_in_flight = IntegerField(default=10)
+    lastfm_requests_per_second = IntegerField(default=5)
+    lastfm_retry_limit = IntegerField(default=5)
+    lastfm_sync_attempts_limit = IntegerField(default=3)
+    lastfm_strict_validation = BooleanField(default=False)
     telegram_token = StringField(null=True)
     telegram_chat_id = IntegerField(null=True)
 
@@ -35,18 +41,49 @@ class DataBase(BaseSection):
     name = StringField(null=True)
     transaction_retry_limit = IntegerField(default=5)
     bunch_size = IntegerField(default=1000)
+    pooled = BooleanField(default=True)
+    max_connections = IntegerField(default=8)
+    stale_timeout = IntegerField(default=300)
+    connection_wait_timeout = IntegerField(default=30)
+    log_queue_size = IntegerField(default=10000)
+    log_batch_size = IntegerField(default=100)
+    log_flush_interval = IntegerField(default=500)
+    sqlite_tuned = BooleanField(default=True)
+    sqlite_journal_mode = StringField(default='wal')
+    sqlite_synchronous = StringField(default='normal')
+    sqlite_cache_size = IntegerField(default=-65536)
+    sqlite_mmap_size = IntegerField(default=268435456)
+    sqlite_temp_store = StringField(default='memory')
+    sqlite_busy_timeout = IntegerField(default=5000)
 
 
 class App(BaseSection):
     bot_request_timeout = IntegerField(default=3600)
     data_getter_timeout = IntegerField(default=18000)
+    place_details_ttl = IntegerField(default=604800)
     sentry_url = StringField(null=True)
     name = StringField(default='CPB and Scrobbler')
 
 
+class Http(BaseSection):
+    lastfm_connections_limit = IntegerField(default=5)
+    kudago_connections_limit = IntegerField(default=6)
+    dns_cache_ttl = IntegerField(default=300)
+    keepalive_timeout = IntegerField(default=30)
+    request_timeout = IntegerField(default=30)
+
+
 class Redis(BaseSection):
     host = StringField(null=True)
     port = IntegerField(null=True)
     password = StringField(null=True)
     db_cache = IntegerField(null=True)
+    backend = StringField(default='redis')
+    max_connections = IntegerField(default=10)
+    socket_timeout = IntegerField(default=5)
+    memory_max_entries = IntegerField(default=100000)
     ttl = IntegerField(default=604800)
+    none_ttl = IntegerField(default=60)
+    namespace = StringField(default='cpb')
+    key_version = IntegerField(default=1)
+    dictionary_cache_size = IntegerField(default=100000)
@@ -0,0 +1,53 @@
+"""
+Base class for tests that run against a real in-memory SQLite database
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from peewee import SqliteDatabase
+
+import cache
+from database import models
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    Binds models to a fresh in-memory SQLite database with all tables and migrations for each test.
+
+    Shared cache tiers are replaced with an in-memory backend and empty dictionaries caches,
+    the previous ones are restored after the test.
+    """
+
+    is_migrated = True
+    # Threads get their own connections, so a database file is used to share data between them.
+    is_shared = False
+
+    def setUp(self) -> None:
+        """Set up test."""
+        previous_db = models.db.obj
+        self.addCleanup(models.db.initialize, previous_db)
+        if self.is_shared:
+            directory = tempfile.TemporaryDirectory()
+            self.addCleanup(directory.cleanup)
+            self.data_base = SqliteDatabase(os.path.join(directory.name, 'test-db'))
+        else:
+            self.data_base = SqliteDatabase(':memory:')
+        models.db.initialize(self.data_base)
+        self.addCleanup(self.data_base.close)
+        with contextlib.redirect_stdout(io.StringIO()):
+            models.BaseModel.recreate_tables()
+            if self.is_migrated:
+                models.SchemaVersion.migrate()
+
+        previous_backend = cache.Backend._backend
+        self.addCleanup(cache.Backend.set, previous_backend)
+        self.backend = cache.MemoryBackend()
+        cache.Backend.set(self.backend)
+
+        previous_dictionaries = cache.Caching._dictionaries
+        self.addCleanup(setattr, cache.Caching, '_dictionaries', previous_dictionaries)
+        cache.Caching._dictionaries = {}
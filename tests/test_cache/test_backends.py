@@ -0,0 +1,197 @@
+"""
+Unit tests for "cache.backends" module
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from cache import Backend, MemoryBackend, NullBackend, RedisBackend
+
+
+class TestMemoryBackend(unittest.TestCase):
+    """
+    Unit tests for "MemoryBackend" class
+    """
+
+    def test_values_are_evicted_by_lru(self):
+
+        # Setup
+
+        backend = MemoryBackend(max_entries=2)
+
+        # Run
+
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get('a')
+        backend.set_many([('c', 3, None)])
+
+        # Assertions
+
+        self.assertEqual(backend.mget(['a', 'b', 'c']), [b'1', None, b'3'])
+        stats = backend.get_stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions), (3, 1, 1))
+        self.assertEqual(stats.requests, 5)
+
+    @patch('cache.backends.time')
+    def test_values_expire(self, time_mock: MagicMock):
+
+        # Setup
+
+        backend = MemoryBackend()
+        time_mock.monotonic.return_value = 100.0
+        backend.set('a', 1, ex=10)
+
+        # Run
+
+        time_mock.monotonic.return_value = 111.0
+        result = backend.get('a')
+
+        # Assertions
+
+        self.assertIsNone(result)
+        self.assertTrue(backend.set('a', 2, ex=10, nx=True))
+
+    def test_set_nx_keeps_existing_value(self):
+
+        # Setup
+
+        backend = MemoryBackend()
+        backend.set('a', 1)
+
+        # Run
+
+        result = backend.set('a', 2, nx=True)
+
+        # Assertions
+
+        self.assertFalse(result)
+        self.assertEqual(backend.get('a'), b'1')
+
+    def test_delete_if_equals_keeps_other_value(self):
+
+        # Setup
+
+        backend = MemoryBackend()
+        backend.set('a', 'token')
+
+        # Run
+
+        is_other_deleted = backend.delete_if_equals('a', 'other')
+        value = backend.get('a')
+        is_deleted = backend.delete_if_equals('a', 'token')
+
+        # Assertions
+
+        self.assertFalse(is_other_deleted)
+        self.assertEqual(value, b'token')
+        self.assertTrue(is_deleted)
+        self.assertIsNone(backend.get('a'))
+
+
+class TestNullBackend(unittest.TestCase):
+    """
+    Unit tests for "NullBackend" class
+    """
+
+    def test_every_request_is_miss(self):
+
+        # Setup
+
+        backend = NullBackend()
+        backend.set('a', 1)
+
+        # Run
+
+        result = backend.mget(['a', 'b'])
+
+        # Assertions
+
+        self.assertEqual(result, [None, None])
+        self.assertEqual(backend.get_stats().misses, 2)
+
+
+@patch('cache.backends.redis')
+class TestRedisBackend(unittest.TestCase):
+    """
+    Unit tests for "RedisBackend" class
+    """
+
+    def test_client_connects_lazily_with_pool(self, redis_mock: MagicMock):
+
+        # Setup
+
+        backend = RedisBackend()
+
+        # Run
+
+        redis_mock.Redis.assert_not_called()
+        backend.set_many([('a', '1', 60), ('b', '2', 60)])
+        backend.get('a')
+
+        # Assertions
+
+        redis_mock.Redis.assert_called_once_with(connection_pool=redis_mock.ConnectionPool.return_value)
+        pipeline = redis_mock.Redis.return_value.pipeline.return_value
+        self.assertEqual(pipeline.set.call_count, 2)
+        pipeline.execute.assert_called_once()
+
+    def test_delete_if_equals_runs_script(self, redis_mock: MagicMock):
+
+        # Setup
+
+        backend = RedisBackend()
+        client = redis_mock.Redis.return_value
+        client.register_script.return_value.return_value = 1
+
+        # Run
+
+        result = backend.delete_if_equals('a', 'token')
+        backend.delete_if_equals('b', 'token')
+
+        # Assertions
+
+        self.assertTrue(result)
+        client.register_script.assert_called_once()
+        client.register_script.return_value.assert_called_with(keys=['b'], args=['token'], client=client)
+        client.get.assert_not_called()
+        client.delete.assert_not_called()
+
+
+@patch('cache.backends.settings')
+class TestBackend(unittest.TestCase):
+    """
+    Unit tests for "Backend" holder
+    """
+
+    def tearDown(self) -> None:
+        """Tear down test."""
+        Backend.set(None)
+
+    def test_backend_is_chosen_by_settings(self, settings_mock: MagicMock):
+
+        # Setup
+
+        Backend.set(None)
+        settings_mock.Redis.backend = 'memory'
+
+        # Run
+
+        backend = Backend.get()
+
+        # Assertions
+
+        self.assertIsInstance(backend, MemoryBackend)
+        self.assertIs(Backend.get(), backend)
+
+    def test_unknown_backend(self, settings_mock: MagicMock):
+
+        # Setup
+
+        Backend.set(None)
+        settings_mock.Redis.backend = 'memcached'
+
+        # Run & Assertions
+
+        with self.assertRaises(ValueError):
+            Backend.get()
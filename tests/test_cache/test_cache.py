@@ -0,0 +1,262 @@
+"""
+Unit tests for "cache.cache" module
+"""
+
+import datetime
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import ANY, MagicMock, patch
+
+from cache import Backend, MemoryBackend, redis_cache
+
+
+def get_name_id(name: str, created: datetime.datetime, limit: int = 10) -> int:
+    return len(name)
+
+
+class TestRedisCacheKeys(unittest.TestCase):
+    """
+    Unit tests for keys of "redis_cache" decorator
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        self.function = redis_cache()(get_name_id)
+        self.created = datetime.datetime(2024, 1, 1, 12)
+
+    def test_key_has_qualified_versioned_namespace(self):
+
+        # Run
+
+        key = self.function.get_key('Muse', self.created)
+
+        # Assertions
+
+        self.assertRegex(key, rf'^\w+:v\d+:{get_name_id.__module__}\.get_name_id:v1:[0-9a-f]{{64}}$')
+
+    def test_key_does_not_depend_on_call_style(self):
+
+        # Run
+
+        keys = {
+            self.function.get_key('Muse', self.created),
+            self.function.get_key('Muse', self.created, 10),
+            self.function.get_key(created=self.created, name='Muse'),
+        }
+
+        # Assertions
+
+        self.assertEqual(len(keys), 1)
+        self.assertNotEqual(self.function.get_key('Muse', self.created, 20), keys.pop())
+
+    def test_key_does_not_depend_on_process(self):
+
+        # Setup
+
+        code = (
+            'import datetime; from tests.test_cache.test_cache import get_name_id; from cache import redis_cache; '
+            'print(redis_cache()(get_name_id).get_key("Muse", datetime.datetime(2024, 1, 1, 12)))'
+        )
+
+        # Run
+
+        keys = {
+            subprocess.run(
+                [sys.executable, '-c', code], capture_output=True, text=True, env={'PYTHONHASHSEED': seed}
+            ).stdout.strip().rsplit(':', 1)[-1]
+            for seed in ('1', '2')
+        }
+
+        # Assertions
+
+        self.assertEqual(keys, {self.function.get_key('Muse', self.created).rsplit(':', 1)[-1]})
+
+    def test_version_bump_changes_key(self):
+
+        # Run
+
+        key = redis_cache(version=2)(get_name_id).get_key('Muse', self.created)
+
+        # Assertions
+
+        self.assertNotEqual(key, self.function.get_key('Muse', self.created))
+
+
+@patch('cache.cache.Backend')
+class TestRedisCache(unittest.TestCase):
+    """
+    Unit tests for "redis_cache" decorator
+    """
+
+    def test_result_is_cached(self, backend_mock: MagicMock):
+
+        # Setup
+
+        function = redis_cache(ttl=60)(get_name_id)
+        created = datetime.datetime(2024, 1, 1, 12)
+        backend = backend_mock.get.return_value
+        backend.get.return_value = None
+
+        # Run
+
+        result = function('Muse', created)
+
+        # Assertions
+
+        self.assertEqual(result, 4)
+        backend.set.assert_called_once_with(function.get_key('Muse', created), '4', 60)
+
+    def test_get_many_resolves_misses_in_batch(self, backend_mock: MagicMock):
+
+        # Setup
+
+        function = redis_cache(ttl=60)(get_name_id)
+        created = datetime.datetime(2024, 1, 1, 12)
+        backend = backend_mock.get.return_value
+        backend.mget.return_value = [b'5', None, None]
+        batch_function = MagicMock(return_value=[7])
+
+        # Run
+
+        result = function.get_many(
+            [('Muse', created), ('Placebo', created), ('Placebo', created)], batch_function=batch_function
+        )
+
+        # Assertions
+
+        self.assertEqual(result, [5, 7, 7])
+        backend.mget.assert_called_once()
+        backend.get.assert_not_called()
+        batch_function.assert_called_once_with([('Placebo', created)])
+        backend.set_many.assert_called_once_with([(function.get_key('Placebo', created), '7', 60)])
+
+
+class TestRedisCacheSingleFlight(unittest.TestCase):
+    """
+    Unit tests for single-flight and negative caching of "redis_cache" decorator
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        self.backend = MemoryBackend(max_entries=100)
+        Backend.set(self.backend)
+        self.addCleanup(Backend.set, None)
+
+    def test_concurrent_misses_call_function_once(self):
+
+        # Setup
+
+        calls = []
+        is_started = threading.Event()
+
+        def get_id(name: str) -> int:
+            calls.append(name)
+            is_started.set()
+            time.sleep(0.1)
+            return 1
+
+        function = redis_cache()(get_id)
+
+        # Run
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(function('Muse'))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assertions
+
+        self.assertEqual(calls, ['Muse'])
+        self.assertEqual(results, [1] * 5)
+
+    def test_lease_holder_result_is_awaited(self):
+
+        # Setup
+
+        function = redis_cache(lease_ttl=1)(get_name_id)
+        key = function.get_key('Muse', datetime.datetime(2024, 1, 1))
+        self.backend.set(f'{key}:lease', 'other', nx=True)
+        threading.Timer(0.1, lambda: self.backend.set(key, '40')).start()
+
+        # Run
+
+        result = function('Muse', datetime.datetime(2024, 1, 1))
+
+        # Assertions
+
+        self.assertEqual(result, 40)
+        self.assertEqual(self.backend.get(f'{key}:lease'), b'other')
+
+    def test_lease_is_released_by_its_holder(self):
+
+        # Setup
+
+        function = redis_cache(lease_ttl=1)(get_name_id)
+        key = function.get_key('Muse', datetime.datetime(2024, 1, 1))
+
+        # Run
+
+        with patch.object(self.backend, 'delete_if_equals', wraps=self.backend.delete_if_equals) as delete_mock:
+            result = function('Muse', datetime.datetime(2024, 1, 1))
+
+        # Assertions
+
+        self.assertEqual(result, 4)
+        self.assertIsNone(self.backend.get(f'{key}:lease'))
+        delete_mock.assert_called_once_with(f'{key}:lease', ANY)
+
+    def test_lease_taken_by_another_holder_is_kept(self):
+
+        # Setup
+
+        def get_id(name: str) -> int:
+            # The lease expired during the computation and another process took it.
+            self.backend.set(f'{key}:lease', 'other')
+            return 1
+
+        function = redis_cache(lease_ttl=1)(get_id)
+        key = function.get_key('Muse')
+
+        # Run
+
+        function('Muse')
+
+        # Assertions
+
+        self.assertEqual(self.backend.get(f'{key}:lease'), b'other')
+
+    def test_none_is_not_cached_by_default(self):
+
+        # Setup
+
+        function = redis_cache()(lambda name: None)
+
+        # Run
+
+        function('Muse')
+
+        # Assertions
+
+        self.assertEqual(self.backend._values, {})
+
+    def test_none_is_cached_with_none_ttl(self):
+
+        # Setup
+
+        function_mock = MagicMock(return_value=None)
+        function = redis_cache(ttl=600, cache_none=True, none_ttl=5)(lambda name: function_mock(name))
+
+        # Run
+
+        results = [function('Muse'), function('Muse')]
+
+        # Assertions
+
+        self.assertEqual(results, [None, None])
+        function_mock.assert_called_once_with('Muse')
+        self.assertLessEqual(next(iter(self.backend._values.values()))[1] - time.monotonic(), 5)
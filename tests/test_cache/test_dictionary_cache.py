@@ -0,0 +1,142 @@
+"""
+Unit tests for "cache.dictionary_cache.DictionaryIdCache" class
+"""
+
+import datetime
+import unittest
+from unittest.mock import ANY, MagicMock, patch
+
+import redis
+from peewee import OperationalError
+
+from cache import Caching, DictionaryIdCache
+from database import Artists, Scrobbles
+from getters.getter_lastfm_scrobble_data import Scrobble
+from tests.database_test_case import DatabaseTestCase
+
+
+@patch('cache.dictionary_cache.Backend')
+class TestResolveMany(unittest.TestCase):
+    """
+    Unit tests for "DictionaryIdCache.resolve_many" method
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        self.model = MagicMock(__name__='Artists')
+        self.cache = DictionaryIdCache(model=self.model, capacity=2)
+
+    def test_resolve_many_uses_each_tier_once(self, backend_mock: MagicMock):
+
+        # Setup
+
+        self.cache._put({'Muse': 1})
+        backend_mock.get.return_value.mget.return_value = [b'2', None]
+        self.model.get_ids.return_value = {'Placebo': 3}
+
+        # Run
+
+        result = self.cache.resolve_many(['Muse', 'Blur', 'Placebo', 'Muse'])
+
+        # Assertions
+
+        self.assertEqual(result, {'Muse': 1, 'Blur': 2, 'Placebo': 3})
+        backend_mock.get.return_value.mget.assert_called_once_with(
+            [self.cache._get_key('Blur'), self.cache._get_key('Placebo')]
+        )
+        self.model.get_ids.assert_called_once_with(['Placebo'])
+        backend_mock.get.return_value.set_many.assert_called_once_with([(self.cache._get_key('Placebo'), 3, ANY)])
+        stats = self.cache.stats
+        self.assertEqual((stats.local_hits, stats.backend_hits, stats.misses), (1, 1, 1))
+        self.assertEqual(list(self.cache._ids), ['Blur', 'Placebo'])
+
+    def test_resolve_many_from_local_tier(self, backend_mock: MagicMock):
+
+        # Setup
+
+        self.cache._put({'Muse': 1})
+
+        # Run
+
+        result = self.cache.resolve_many(['Muse'])
+
+        # Assertions
+
+        self.assertEqual(result, {'Muse': 1})
+        backend_mock.get.return_value.mget.assert_not_called()
+        self.model.get_ids.assert_not_called()
+        self.assertEqual(self.cache.stats.local_hit_rate, 1.0)
+
+    def test_resolve_many_without_redis(self, backend_mock: MagicMock):
+
+        # Setup
+
+        backend_mock.get.return_value.mget.side_effect = redis.ConnectionError
+        backend_mock.get.return_value.set_many.side_effect = redis.ConnectionError
+        self.model.get_ids.return_value = {'Muse': 1}
+
+        # Run
+
+        result = self.cache.resolve_many(['Muse'])
+
+        # Assertions
+
+        self.assertEqual(result, {'Muse': 1})
+        self.assertEqual(self.cache.stats.misses, 1)
+
+
+class TestWarmUp(unittest.TestCase):
+    """
+    Unit tests for "DictionaryIdCache.warm_up" method
+    """
+
+    def test_warm_up_keeps_latest_names_last(self):
+
+        # Setup
+
+        model = MagicMock(__name__='Artists')
+        model.select.return_value.order_by.return_value.limit.return_value.tuples.return_value.iterator.return_value = \
+            iter([('Placebo', 3), ('Blur', 2), ('Muse', 1)])
+        dictionary_cache = DictionaryIdCache(model=model, capacity=3)
+
+        # Run
+
+        result = dictionary_cache.warm_up()
+
+        # Assertions
+
+        self.assertEqual(result, 3)
+        self.assertEqual(list(dictionary_cache._ids.items()), [('Muse', 1), ('Blur', 2), ('Placebo', 3)])
+
+
+class TestDeferred(DatabaseTestCase):
+    """
+    Unit tests for "DictionaryIdCache.deferred" method with a real database
+    """
+
+    scrobble = Scrobble(
+        artist='Muse', album='Origin of Symmetry', track='Plug In Baby', date=datetime.datetime(2024, 1, 1)
+    )
+
+    def test_ids_of_rolled_back_rows_are_not_cached(self):
+
+        # Setup
+
+        artists_cache = Caching.get_dictionary_cache(Artists)
+
+        # Run
+
+        with patch.object(Scrobbles, '_add_plays', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                Scrobbles.add_many([self.scrobble])
+
+        # Assertions
+
+        self.assertFalse(Artists.select().exists())
+        self.assertEqual(len(artists_cache._ids), 0)
+        self.assertIsNone(self.backend.get(artists_cache._get_key('Muse')))
+        Scrobbles.add_many([self.scrobble])
+        artist_id = Artists.get(Artists.name == 'Muse').id
+        self.assertEqual(artists_cache.get_id('Muse'), artist_id)
+        self.assertEqual(Scrobbles.get().artist_id, artist_id)
+        self.assertEqual(self.backend.get(artists_cache._get_key('Muse')), str(artist_id).encode())
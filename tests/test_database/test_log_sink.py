@@ -0,0 +1,77 @@
+"""
+Unit tests for "database.log_sink.LogSink" class
+"""
+
+import datetime
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from database import LogRecord, LogSink
+
+
+class TestLogSink(unittest.TestCase):
+    """
+    Unit tests for "LogSink" class
+    """
+
+    record = LogRecord(date=datetime.datetime(2024, 1, 1), message='Error', level='error')
+
+    def test_records_are_written_by_batches(self):
+
+        # Setup
+
+        write = MagicMock()
+        sink = LogSink(write=write, queue_size=10, batch_size=2, flush_interval=5)
+
+        # Run
+
+        for _ in range(3):
+            sink.put(self.record)
+        sink.close()
+
+        # Assertions
+
+        self.assertEqual([len(call.args[0]) for call in write.call_args_list], [2, 1])
+        self.assertEqual(sink.dropped, 0)
+
+    def test_records_are_dropped_if_queue_is_full(self):
+
+        # Setup
+
+        is_writing = threading.Event()
+        is_released = threading.Event()
+
+        def write(_):
+            is_writing.set()
+            is_released.wait()
+
+        sink = LogSink(write=write, queue_size=1, batch_size=1, flush_interval=0)
+
+        # Run
+
+        sink.put(self.record)
+        is_writing.wait()
+        results = [sink.put(self.record) for _ in range(3)]
+        is_released.set()
+        sink.close()
+
+        # Assertions
+
+        self.assertEqual(results, [True, False, False])
+        self.assertEqual(sink.dropped, 2)
+
+    def test_failed_batches_are_counted_as_dropped(self):
+
+        # Setup
+
+        sink = LogSink(write=MagicMock(side_effect=Exception), queue_size=10, batch_size=10, flush_interval=0)
+
+        # Run
+
+        sink.put(self.record)
+        sink.close()
+
+        # Assertions
+
+        self.assertEqual(sink.dropped, 1)
@@ -0,0 +1,72 @@
+"""
+Unit tests for "database.models.SchemaVersion.migrate" method
+"""
+
+import contextlib
+import datetime
+import io
+
+from peewee import IntegrityError
+
+from database import EventDates, Events, Places, SchemaVersion
+from database.migrations import MIGRATIONS
+from tests.database_test_case import DatabaseTestCase
+
+
+class TestMigrate(DatabaseTestCase):
+    """
+    Unit tests for "SchemaVersion.migrate" method with a real database
+    """
+
+    is_migrated = False
+
+    def test_migrate_is_idempotent(self):
+
+        # Setup
+
+        start = datetime.datetime(2024, 6, 1, 19)
+        stop = datetime.datetime(2024, 6, 1, 22)
+        Places.create(place_id=1, address='Address', title='Club')
+        Events.create(event_id=1, title='Muse', slug='muse', place_id=1, price='1000')
+        for date_start in (start, start, start + datetime.timedelta(days=1)):
+            EventDates.create(event_id=1, date_start=date_start, date_stop=stop)
+
+        # Run
+
+        with contextlib.redirect_stdout(io.StringIO()) as first_output:
+            SchemaVersion.migrate()
+        with contextlib.redirect_stdout(io.StringIO()) as second_output:
+            SchemaVersion.migrate()
+
+        # Assertions
+
+        self.assertEqual(first_output.getvalue().count('was applied'), len(MIGRATIONS))
+        self.assertEqual(second_output.getvalue(), '')
+        self.assertEqual(SchemaVersion.get_version(), MIGRATIONS[-1].version)
+        self.assertEqual(
+            list(SchemaVersion.select(SchemaVersion.version).order_by(SchemaVersion.version).tuples()),
+            [(migration.version,) for migration in MIGRATIONS]
+        )
+        self.assertEqual(
+            sorted(date_start for date_start, in EventDates.select(EventDates.date_start).tuples()),
+            [start, start + datetime.timedelta(days=1)]
+        )
+        with self.assertRaises(IntegrityError):
+            EventDates.create(event_id=1, date_start=start, date_stop=stop)
+
+    def test_migrate_adds_missing_columns(self):
+
+        # Setup
+
+        self.data_base.execute_sql('ALTER TABLE places DROP COLUMN fetched')
+        Places.insert(place_id=1, address='Address', title='Club').execute()
+
+        # Run
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            SchemaVersion.migrate()
+
+        # Assertions
+
+        self.assertIn('fetched', [column.name for column in self.data_base.get_columns('places')])
+        self.assertIsNone(Places.get().fetched)
@@ -0,0 +1,380 @@
+"""
+Unit tests for "database.models" module with a real database
+"""
+
+import contextlib
+import datetime
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from peewee import OperationalError, SqliteDatabase
+
+import settings
+from cache import Caching
+from database import (
+    Albums, ArtistDailyPlays, ArtistPlays, Artists, EventDates, Events, IngestResult, Places, Scrobbles, Tracks,
+    initialize_data_base, unit_of_work
+)
+from database import models
+from getters.getter_lastfm_scrobble_data import Scrobble
+from tests.database_test_case import DatabaseTestCase
+
+
+def get_scrobbles(count: int, artists: int = 2) -> list[Scrobble]:
+    return [
+        Scrobble(
+            artist=f'Artist {i % artists}',
+            album=f'Album {i % artists}',
+            track=f'Track {i}',
+            date=datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=i * 4)
+        ) for i in range(count)
+    ]
+
+
+class TestInitializeDataBase(unittest.TestCase):
+    """
+    Unit tests for "initialize_data_base" function with a local database
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.local_db = SqliteDatabase(os.path.join(directory.name, 'cpb-local-db'))
+        self.addCleanup(self.local_db.close)
+        local_db_patcher = patch.object(models, 'local_db', self.local_db)
+        local_db_patcher.start()
+        self.addCleanup(local_db_patcher.stop)
+        self.addCleanup(models.db.initialize, models.db.obj)
+
+    def get_pragma(self, name: str):
+        return self.local_db.execute_sql(f'PRAGMA {name}').fetchone()[0]
+
+    def test_performance_profile_is_applied_on_connect(self):
+
+        # Run
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            initialize_data_base(is_local=True)
+
+        # Assertions
+
+        self.assertIs(models.db.obj, self.local_db)
+        self.assertEqual(self.get_pragma('journal_mode'), settings.DataBase.sqlite_journal_mode)
+        self.assertEqual(self.get_pragma('synchronous'), 1)
+        self.assertEqual(self.get_pragma('cache_size'), settings.DataBase.sqlite_cache_size)
+        self.assertEqual(self.get_pragma('temp_store'), 2)
+        self.assertEqual(self.get_pragma('busy_timeout'), settings.DataBase.sqlite_busy_timeout)
+
+    @patch('database.models.settings')
+    def test_defaults_are_kept_without_profile(self, settings_mock: MagicMock):
+
+        # Setup
+
+        settings_mock.DataBase.sqlite_tuned = False
+        settings_mock.DataBase.sqlite_busy_timeout = 1000
+
+        # Run
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            initialize_data_base(is_local=True)
+
+        # Assertions
+
+        self.assertEqual(models.get_sqlite_pragmas(), {})
+        self.assertEqual(self.get_pragma('journal_mode'), 'delete')
+        self.assertEqual(self.get_pragma('synchronous'), 2)
+        self.assertEqual(self.get_pragma('busy_timeout'), 1000)
+
+
+class TestUnitOfWork(DatabaseTestCase):
+    """
+    Unit tests for "unit_of_work" function
+    """
+
+    def test_nested_blocks_use_the_outer_connection(self):
+
+        # Setup
+
+        models.db.close()
+
+        # Run
+
+        with unit_of_work():
+            connection = models.db.connection()
+            with unit_of_work():
+                inner_connection = models.db.connection()
+            is_closed_after_inner = models.db.is_closed()
+
+        # Assertions
+
+        self.assertIs(inner_connection, connection)
+        self.assertFalse(is_closed_after_inner)
+        self.assertTrue(models.db.is_closed())
+
+
+class TestDictionaryGetIds(DatabaseTestCase):
+    """
+    Unit tests for "_DictionaryModel.get_ids" method
+    """
+
+    def test_get_ids_inserts_missing_names(self):
+
+        # Setup
+
+        muse = Artists.create(name='Muse')
+
+        # Run
+
+        result = Artists.get_ids(['Muse', 'Blur', 'Blur'])
+
+        # Assertions
+
+        self.assertEqual(result, dict(Artists.select(Artists.name, Artists.id).tuples()))
+        self.assertEqual(result['Muse'], muse.id)
+        self.assertEqual(Artists.select().count(), 2)
+        self.assertEqual(Artists.get_ids(['Blur']), {'Blur': result['Blur']})
+
+
+class TestScrobblesAddMany(DatabaseTestCase):
+    """
+    Unit tests for "Scrobbles.add_many" method
+    """
+
+    def test_add_many_inserts_scrobbles(self):
+
+        # Setup
+
+        scrobbles = get_scrobbles(5)
+
+        # Run
+
+        result = Scrobbles.add_many(scrobbles)
+
+        # Assertions
+
+        self.assertEqual(result, IngestResult(inserted=5, skipped=0))
+        stored = Scrobbles.select(Artists.name, Scrobbles.scrobble_date).join(Artists).order_by(Scrobbles.scrobble_date)
+        self.assertEqual(list(stored.tuples()), [(scrobble.artist, scrobble.date) for scrobble in scrobbles])
+        self.assertEqual(Artists.select().count(), 2)
+
+    def test_add_many_skips_stored_scrobbles(self):
+
+        # Setup
+
+        scrobbles = get_scrobbles(6)
+        Scrobbles.add_many(scrobbles[:4])
+
+        # Run
+
+        result = Scrobbles.add_many(scrobbles + scrobbles[5:])
+
+        # Assertions
+
+        self.assertEqual(result, IngestResult(inserted=2, skipped=5))
+        self.assertEqual(Scrobbles.select().count(), 6)
+
+    @patch('database.models.settings')
+    def test_add_many_by_bunches(self, settings_mock: MagicMock):
+
+        # Setup
+
+        settings_mock.DataBase.bunch_size = 2
+        settings_mock.DataBase.transaction_retry_limit = 1
+        scrobbles = get_scrobbles(5)
+
+        # Run
+
+        result = Scrobbles.add_many(scrobbles)
+
+        # Assertions
+
+        self.assertEqual(result, IngestResult(inserted=5, skipped=0))
+        self.assertEqual(Scrobbles.select().count(), 5)
+
+    def test_add_many_retries_rolled_back_bunch(self):
+
+        # Setup
+
+        insert_bunch = Scrobbles._insert_bunch
+        attempts = []
+
+        def insert_and_fail_once(bunch):
+            attempts.append(bunch)
+            count = insert_bunch(bunch)
+            if len(attempts) == 1:
+                raise OperationalError('database is locked')
+            return count
+
+        # Run
+
+        with patch.object(Scrobbles, '_insert_bunch', side_effect=insert_and_fail_once):
+            result = Scrobbles.add_many(get_scrobbles(3))
+
+        # Assertions
+
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(result, IngestResult(inserted=3, skipped=0))
+        self.assertEqual(Scrobbles.select().count(), 3)
+        self.assertEqual(
+            set(Scrobbles.select(Scrobbles.artist).tuples()), set(Artists.select(Artists.id).tuples())
+        )
+
+    def test_add_many_raises_after_retry_limit(self):
+
+        # Setup
+
+        retry_limit = settings.DataBase.transaction_retry_limit
+
+        # Run
+
+        with patch.object(Scrobbles, '_add_plays', side_effect=OperationalError('database is locked')) as add_plays:
+            with self.assertRaises(OperationalError):
+                Scrobbles.add_many(get_scrobbles(3))
+
+        # Assertions
+
+        self.assertEqual(add_plays.call_count, retry_limit)
+        self.assertFalse(Scrobbles.select().exists())
+        self.assertFalse(Artists.select().exists())
+
+    def test_add_many_counts_plays_of_inserted_rows_only(self):
+
+        # Setup
+
+        scrobbles = get_scrobbles(2, artists=1)
+        tracks_cache = Caching.get_dictionary_cache(Tracks)
+        resolve_many = tracks_cache.resolve_many
+
+        def resolve_and_insert_concurrently(names):
+            ids = resolve_many(names)
+            # Another writer stores the first scrobble after it was checked to be missing.
+            Scrobbles.insert(
+                artist=Artists.get(Artists.name == scrobbles[0].artist),
+                album=Albums.get(Albums.name == scrobbles[0].album),
+                track=ids[scrobbles[0].track],
+                scrobble_date=scrobbles[0].date
+            ).execute()
+            return ids
+
+        # Run
+
+        with patch.object(tracks_cache, 'resolve_many', side_effect=resolve_and_insert_concurrently):
+            result = Scrobbles.add_many(scrobbles)
+
+        # Assertions
+
+        self.assertEqual(result, IngestResult(inserted=1, skipped=1))
+        self.assertEqual(Scrobbles.select().count(), 2)
+        self.assertEqual(ArtistPlays.get().plays, 1)
+        self.assertEqual(ArtistDailyPlays.get_total_plays(), 1)
+
+
+class TestEventsBulkStore(DatabaseTestCase):
+    """
+    Unit tests for bulk stores of "Places", "Events" and "EventDates" models
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        super().setUp()
+        Places.add_many([{'place_id': 1, 'address': 'Address', 'title': 'Club', 'fetched': None}])
+        Events.add_many([
+            {'event_id': event_id, 'title': 'Muse', 'slug': f'muse-{event_id}', 'place_id': 1, 'price': '1000'}
+            for event_id in (1, 2)
+        ])
+        Events.update(is_sent=True).execute()
+
+    def test_places_add_many_updates_stored_places(self):
+
+        # Run
+
+        Places.add_many([
+            {'place_id': 1, 'address': 'New address', 'title': 'Club', 'fetched': None},
+            {'place_id': 2, 'address': 'Address', 'title': 'Hall', 'fetched': None}
+        ])
+
+        # Assertions
+
+        self.assertEqual(
+            list(Places.select(Places.place_id, Places.address).order_by(Places.place_id).tuples()),
+            [(1, 'New address'), (2, 'Address')]
+        )
+
+    def test_events_add_many_overwrites_updated_events(self):
+
+        # Run
+
+        Events.add_many(
+            [{'event_id': 1, 'title': 'Muse. Extra show', 'slug': 'muse-1', 'place_id': 1, 'price': '2000'}],
+            updated=True
+        )
+
+        # Assertions
+
+        self.assertEqual(
+            list(
+                Events
+                .select(Events.event_id, Events.title, Events.price, Events.updated, Events.is_sent)
+                .order_by(Events.event_id)
+                .tuples()
+            ),
+            [(1, 'Muse. Extra show', '2000', True, False), (2, 'Muse', '1000', False, True)]
+        )
+
+    def test_events_add_many_keeps_stored_events(self):
+
+        # Run
+
+        Events.add_many(
+            [{'event_id': 1, 'title': 'Muse. Extra show', 'slug': 'muse-1', 'place_id': 1, 'price': '2000'}]
+        )
+
+        # Assertions
+
+        self.assertEqual(Events.select().count(), 2)
+        event = Events.get(Events.event_id == 1)
+        self.assertEqual((event.title, event.updated, event.is_sent), ('Muse', False, True))
+
+    def test_event_dates_replace_many_drops_stale_dates(self):
+
+        # Setup
+
+        first, second, third = (datetime.datetime(2024, 6, day, 19) for day in (1, 2, 3))
+        EventDates.replace_many({1: [(first, first), (second, second)], 2: [(first, first)]})
+
+        # Run
+
+        EventDates.replace_many({1: [(second, second), (third, third)]})
+
+        # Assertions
+
+        self.assertEqual(
+            list(
+                EventDates
+                .select(EventDates.event_id, EventDates.date_start)
+                .order_by(EventDates.event_id, EventDates.date_start)
+                .tuples()
+            ),
+            [(1, second), (1, third), (2, first)]
+        )
+
+    def test_event_dates_replace_many_stores_repeated_dates_once(self):
+
+        # Setup
+
+        first, second = (datetime.datetime(2024, 6, day, 19) for day in (1, 2))
+
+        # Run
+
+        EventDates.replace_many({1: [(first, first), (second, second), (first, first)]})
+
+        # Assertions
+
+        self.assertEqual(
+            list(EventDates.select(EventDates.date_start).order_by(EventDates.date_start).tuples()),
+            [(first,), (second,)]
+        )
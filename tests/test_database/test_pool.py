@@ -0,0 +1,88 @@
+"""
+Unit tests for "database.pool" module
+"""
+
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from peewee import PostgresqlDatabase
+from playhouse.pool import MaxConnectionsExceeded
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from database.pool import PoolStats, StatsPooledPostgresqlDatabase
+
+
+def get_connection() -> MagicMock:
+    connection = MagicMock(closed=False)
+    connection.get_transaction_status.return_value = TRANSACTION_STATUS_IDLE
+    return connection
+
+
+@patch.object(PostgresqlDatabase, '_connect', side_effect=get_connection)
+class TestStatsPooledPostgresqlDatabase(unittest.TestCase):
+    """
+    Unit tests for "StatsPooledPostgresqlDatabase" class
+    """
+
+    @staticmethod
+    def get_data_base(**kwargs) -> StatsPooledPostgresqlDatabase:
+        data_base = StatsPooledPostgresqlDatabase('test', **kwargs)
+        data_base.server_version = 160000
+        return data_base
+
+    def test_get_stats_counts_connections(self, _):
+
+        # Setup
+
+        data_base = self.get_data_base(max_connections=4)
+
+        # Run
+
+        data_base.connect()
+        stats_in_use = data_base.get_stats()
+        data_base.close()
+
+        # Assertions
+
+        self.assertEqual(stats_in_use, PoolStats(max_connections=4, in_use=1, idle=0, waits=0, recycles=0))
+        self.assertEqual(data_base.get_stats(), PoolStats(max_connections=4, in_use=0, idle=1, waits=0, recycles=0))
+
+    def test_wait_is_counted_once_per_connect(self, _):
+
+        # Setup
+
+        data_base = self.get_data_base(max_connections=1, timeout=0.25)
+        holder = threading.Thread(target=data_base.connect)
+        holder.start()
+        holder.join()
+
+        # Run
+
+        with self.assertRaises(MaxConnectionsExceeded):
+            data_base.connect()
+
+        # Assertions
+
+        self.assertEqual(data_base.get_stats().waits, 1)
+        self.assertEqual(data_base.get_stats().in_use, 1)
+
+    @patch('playhouse.pool.time')
+    def test_stale_connection_is_recycled(self, time_mock: MagicMock, connect_mock: MagicMock):
+
+        # Setup
+
+        time_mock.time.return_value = 1000.0
+        data_base = self.get_data_base(max_connections=4, stale_timeout=300)
+        data_base.connect()
+        data_base.close()
+        time_mock.time.return_value = 2000.0
+
+        # Run
+
+        data_base.connect()
+
+        # Assertions
+
+        self.assertEqual(data_base.get_stats(), PoolStats(max_connections=4, in_use=1, idle=0, waits=0, recycles=1))
+        self.assertEqual(connect_mock.call_count, 2)
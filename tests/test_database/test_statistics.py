@@ -0,0 +1,145 @@
+"""
+Unit tests for "database.statistics" module
+"""
+
+import datetime
+import unittest
+
+from database import AlbumDailyPlays, ArtistDailyPlays, ArtistPlays, Artists, Period, Scrobbles, Statistics
+from getters.getter_lastfm_scrobble_data import Scrobble
+from tests.database_test_case import DatabaseTestCase
+
+
+class TestPeriod(unittest.TestCase):
+    """
+    Unit tests for "Period.get_since" method
+    """
+
+    def test_get_since(self):
+
+        # Setup
+
+        today = datetime.date(2024, 3, 15)
+        expected = {
+            Period.LAST_7_DAYS: datetime.date(2024, 3, 9),
+            Period.LAST_30_DAYS: datetime.date(2024, 2, 15),
+            Period.LAST_90_DAYS: datetime.date(2023, 12, 17),
+            Period.LAST_365_DAYS: datetime.date(2023, 3, 17),
+            Period.THIS_MONTH: datetime.date(2024, 3, 1),
+            Period.THIS_YEAR: datetime.date(2024, 1, 1),
+            Period.ALL_TIME: None
+        }
+
+        # Run
+
+        result = {period: period.get_since(today) for period in Period}
+
+        # Assertions
+
+        self.assertEqual(result, expected)
+
+    def test_get_since_uses_utc_today(self):
+
+        # Run
+
+        result = Period.LAST_7_DAYS.get_since()
+
+        # Assertions
+
+        self.assertEqual(result, datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=6))
+
+
+class TestDailyPlays(DatabaseTestCase):
+    """
+    Unit tests for "_DailyPlaysModel" rollups with a real database
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        super().setUp()
+        self.now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        plays = [
+            ('Muse', 'Origin of Symmetry', 1), ('Muse', 'Absolution', 2), ('Muse', 'Absolution', 40),
+            ('Blur', 'Parklife', 3), ('Blur', 'Parklife', 3), ('Blur', 'Parklife', 50),
+            ('Placebo', 'Meds', 60)
+        ]
+        Scrobbles.add_many([
+            Scrobble(
+                artist=artist,
+                album=album,
+                track=f'Track {i}',
+                date=self.now - datetime.timedelta(days=days_ago, minutes=i)
+            ) for i, (artist, album, days_ago) in enumerate(plays)
+        ])
+
+    def get_rows(self) -> list[tuple]:
+        return sorted(
+            (model.__name__, key, day, plays)
+            for model in (ArtistDailyPlays, AlbumDailyPlays)
+            for key, day, plays in model.select(model.get_key(), model.day, model.plays).tuples()
+        )
+
+    def test_add_plays_by_utc_days(self):
+
+        # Setup
+
+        late = datetime.datetime(2024, 3, 15, 23, 59)
+
+        # Run
+
+        Scrobbles.add_many([Scrobble(artist='Muse', album='Drones', track='Dead Inside', date=late)])
+
+        # Assertions
+
+        day = ArtistDailyPlays.select(ArtistDailyPlays.day).join(Artists).where(
+            Artists.name == 'Muse', ArtistDailyPlays.day < datetime.date(2025, 1, 1)
+        ).scalar()
+        self.assertEqual(day, datetime.date(2024, 3, 15))
+
+    def test_rebuild_matches_incremental_plays(self):
+
+        # Setup
+
+        incremental = self.get_rows()
+        ArtistDailyPlays.delete().execute()
+        AlbumDailyPlays.delete().execute()
+
+        # Run
+
+        ArtistDailyPlays.seed()
+        AlbumDailyPlays.seed()
+        AlbumDailyPlays.seed()
+
+        # Assertions
+
+        self.assertEqual(self.get_rows(), incremental)
+        self.assertEqual(ArtistDailyPlays.get_total_plays(), 7)
+
+    def test_get_top(self):
+
+        # Run
+
+        all_time = Statistics.get_top_artists(limit=2)
+        last_30_days = Statistics.get_top_artists(period=Period.LAST_30_DAYS)
+        albums = Statistics.get_top_albums(period=Period.LAST_30_DAYS, limit=1)
+
+        # Assertions
+
+        self.assertEqual(all_time, [('Blur', 3), ('Muse', 3)])
+        self.assertEqual(last_30_days, [('Blur', 2), ('Muse', 2)])
+        self.assertEqual(albums, [('Parklife', 2)])
+        self.assertEqual(ArtistPlays.get_top_artists(limit=1, period_days=30), ['Blur'])
+
+    def test_get_new(self):
+
+        # Run
+
+        new_artists = Statistics.get_new_artists(period=Period.LAST_30_DAYS)
+        new_albums = Statistics.get_new_albums(period=Period.LAST_30_DAYS)
+        plays_count = Statistics.get_plays_count(period=Period.LAST_7_DAYS)
+
+        # Assertions
+
+        self.assertEqual(new_artists, [])
+        self.assertEqual(new_albums, ['Origin of Symmetry'])
+        self.assertEqual(plays_count, 4)
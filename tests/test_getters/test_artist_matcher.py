@@ -0,0 +1,50 @@
+"""
+Unit tests for "getters.artist_matcher" module
+"""
+
+import unittest
+
+from getters.artist_matcher import ArtistMatcher, get_artist_matcher
+
+
+class TestArtistMatcher(unittest.TestCase):
+    """
+    Unit tests for "ArtistMatcher" class
+    """
+
+    def test_find_is_ok(self):
+
+        # Setup
+
+        matcher = ArtistMatcher(artists=['Muse', 'The  Cure', 'he', 'Сплин', 'AC/DC', ''])
+
+        # Assertions
+
+        self.assertEqual(matcher.find('MUSE. Live in Moscow'), {'Muse'})
+        self.assertEqual(matcher.find('the cure\ttour'), {'The  Cure'})
+        self.assertEqual(matcher.find('Сплин и AC/DC tribute'), {'Сплин', 'AC/DC'})
+        self.assertEqual(matcher.find('She'), set())
+
+    def test_whole_words(self):
+
+        # Assertions
+
+        self.assertFalse(ArtistMatcher(artists=['Muse']).matches('Museum night'))
+        self.assertTrue(ArtistMatcher(artists=['Muse'], whole_words=False).matches('Museum night'))
+
+    def test_overlapping_names(self):
+
+        # Setup
+
+        matcher = ArtistMatcher(artists=['Black Sabbath', 'Sabbath', 'Black'], whole_words=False)
+
+        # Assertions
+
+        self.assertEqual(matcher.find('Black Sabbath tribute'), {'Black Sabbath', 'Sabbath', 'Black'})
+
+    def test_get_artist_matcher_is_cached(self):
+
+        # Assertions
+
+        self.assertIs(get_artist_matcher(('Muse',)), get_artist_matcher(('Muse',)))
+        self.assertIsNot(get_artist_matcher(('Muse',)), get_artist_matcher(('Muse', 'Placebo')))
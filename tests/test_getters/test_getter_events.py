@@ -0,0 +1,140 @@
+"""
+Unit tests for "getters.getter_events.GetterEvents" class
+"""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+
+import schemas
+from getters import GetterEvents
+
+
+class TestGetterEvents(unittest.TestCase):
+    """
+    Base class for "GetterEvents" tests
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        with patch('getters.getter_events.logger'):
+            self.getter = GetterEvents()
+
+
+@patch('getters.getter_events.runtime')
+class TestGetKudagoPages(TestGetterEvents):
+    """
+    Unit tests for "GetterEvents._get_kudago_pages" method
+    """
+
+    url = 'https://kudago.com/public-api/v1.4/events/?page_size=100&location=msk'
+
+    @staticmethod
+    def page(event_id: int) -> schemas.EventsList:
+        return schemas.EventsList(
+            count=250,
+            next=None,
+            previous=None,
+            results=[schemas.Event(id=event_id, dates=[], title='Title', slug='slug', place=None, price='')]
+        )
+
+    def test__get_kudago_pages_is_ok(self, runtime_mock: MagicMock):
+
+        # Setup
+
+        self.getter._get_kudago_page = AsyncMock(side_effect=[self.page(1), self.page(2), self.page(3)])
+
+        # Run
+
+        pages = asyncio.run(self.getter._get_kudago_pages(self.url))
+
+        # Assertions
+
+        self.assertEqual([page.results[0].id for page in pages], [1, 2, 3])
+        self.assertEqual(
+            [call.kwargs['url'] for call in self.getter._get_kudago_page.call_args_list],
+            [self.url, f'{self.url}&page=2', f'{self.url}&page=3']
+        )
+
+    @patch('getters.getter_events.sentry')
+    def test__get_kudago_pages_keeps_good_pages(self, sentry_mock: MagicMock, runtime_mock: MagicMock):
+
+        # Setup
+
+        exception = Exception()
+        self.getter._get_kudago_page = AsyncMock(side_effect=[self.page(1), exception, self.page(3)])
+
+        # Run
+
+        pages = asyncio.run(self.getter._get_kudago_pages(self.url))
+
+        # Assertions
+
+        self.assertEqual([page.results[0].id for page in pages], [1, 3])
+        sentry_mock.capture_exception.assert_called_once_with(exception)
+
+    @patch('getters.getter_events.sentry')
+    def test__get_kudago_pages_skips_cancelled_pages(self, sentry_mock: MagicMock, runtime_mock: MagicMock):
+
+        # Setup
+
+        self.getter._get_kudago_page = AsyncMock(side_effect=[self.page(1), self.page(2), asyncio.CancelledError()])
+
+        # Run
+
+        pages = asyncio.run(self.getter._get_kudago_pages(self.url))
+
+        # Assertions
+
+        self.assertEqual([page.results[0].id for page in pages], [1, 2])
+        self.assertIsInstance(sentry_mock.capture_exception.call_args.args[0], asyncio.CancelledError)
+
+
+class TestGetEvents(TestGetterEvents):
+    """
+    Unit tests for "GetterEvents._get_events" method
+    """
+
+    def test__get_events_is_ok(self):
+
+        # Setup
+
+        events = [
+            Mock(id=1, title='Muse. Концерт'),
+            Mock(id=2, title='Museum night'),
+            Mock(id=1, title='Muse. Концерт'),
+            Mock(id=3, title='Placebo')
+        ]
+
+        # Run
+
+        result = self.getter._get_events(events=iter(events), artists=['Muse', 'Placebo'])
+
+        # Assertions
+
+        self.assertEqual([event.id for event in result], [1, 3])
+
+
+@patch('getters.getter_events.settings')
+@patch('getters.getter_events.db')
+class TestGetScrobbledArtists(TestGetterEvents):
+    """
+    Unit tests for "GetterEvents._get_scrobbled_artists" method
+    """
+
+    def test__get_scrobbled_artists_is_ok(self, db_mock: MagicMock, settings_mock: MagicMock):
+
+        # Setup
+
+        settings_mock.APIs.lastfm_artists_limit = 300
+        settings_mock.APIs.top_artists_period_days = 90
+        db_mock.ArtistPlays.get_top_artists.return_value = ['Muse', 'Placebo']
+
+        # Run
+
+        result = self.getter._get_scrobbled_artists()
+
+        # Assertions
+
+        self.assertEqual(result, ['Muse', 'Placebo'])
+        db_mock.ArtistPlays.get_top_artists.assert_called_once_with(limit=300, period_days=90)
@@ -2,10 +2,17 @@
 Unit tests for "getters.getter_lastfm_scrobble_data.LastFMScrobbleDataGetter" class
 """
 
+import asyncio
+import datetime
 import unittest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 
+import settings
+from database import Scrobbles, ScrobbleSyncPages, ScrobbleSyncRuns
 from getters import LastFMScrobbleDataGetter
+from getters.errors import LastFMResponseError
+from getters.getter_lastfm_scrobble_data import Page, Scrobble, ScrobbleBatch, SyncStats
+from tests.database_test_case import DatabaseTestCase
 
 
 class TestLastFMScrobbleDataGetter(unittest.TestCase):
@@ -33,23 +40,25 @@ class TestInit(TestLastFMScrobbleDataGetter):
         """
         # Assertions
 
-        self.assertEqual(self.getter._pages_for_retry, [])
+        self.assertEqual(self.getter._failed_pages, [])
 
 
 @patch('getters.getter_lastfm_scrobble_data.time')
-@patch('getters.getter_lastfm_scrobble_data.cache')
+@patch('getters.getter_lastfm_scrobble_data.runtime')
+@patch('getters.getter_lastfm_scrobble_data.db')
 class TestGetScrobbles(TestLastFMScrobbleDataGetter):
     """
     Unit tests for "_ProtoWorkerBMCUpdater.get_scrobbles" method
     """
 
-    def test_get_scrobbles_is_ok(self, cache_mock: MagicMock, time_mock: MagicMock):
+    def test_get_scrobbles_is_ok(self, db_mock: MagicMock, runtime_mock: MagicMock, time_mock: MagicMock):
 
         # Setup
 
-        scrobble = Mock(track=Mock(), artist=Mock(), album=Mock(), scrobble=Mock())
-        page = Mock(scrobbles=[scrobble])
-        self.getter._get_pages = Mock(return_value=[page])
+        self.getter._sync = Mock()
+        runtime_mock.Runtime.run.return_value = SyncStats(total_pages=1)
+        db_mock.ScrobbleSyncRuns.get_unfinished.return_value = None
+        run = db_mock.ScrobbleSyncRuns.add.return_value
 
         # Run
 
@@ -57,19 +66,126 @@ class TestGetScrobbles(TestLastFMScrobbleDataGetter):
 
         # Assertions
 
-        cache_mock.Caching.get_scrobble_id.assert_called_once_with(
-            track=scrobble.track,
-            artist=scrobble.artist,
-            album=scrobble.album,
-            scrobble_date=scrobble.date
+        self.getter._sync.assert_called_once_with(run=run, stored_pages=set())
+        runtime_mock.Runtime.run.assert_called_once_with(self.getter._sync.return_value)
+        run.mark_as_finished.assert_called_once_with(total_pages=1)
+
+    def test_get_scrobbles_resumes_run(self, db_mock: MagicMock, runtime_mock: MagicMock, time_mock: MagicMock):
+
+        # Setup
+
+        self.getter._sync = Mock()
+        runtime_mock.Runtime.run.return_value = SyncStats(total_pages=3)
+        run = db_mock.ScrobbleSyncRuns.get_unfinished.return_value
+        run.attempts = 1
+        run.get_stored_pages.return_value = {1, 2}
+
+        # Run
+
+        self.getter.get_scrobbles()
+
+        # Assertions
+
+        db_mock.ScrobbleSyncRuns.add.assert_not_called()
+        run.add_attempt.assert_called_once_with()
+        self.getter._sync.assert_called_once_with(run=run, stored_pages={1, 2})
+        run.mark_as_finished.assert_called_once_with(total_pages=3)
+
+    @patch('getters.getter_lastfm_scrobble_data.settings')
+    def test_get_scrobbles_gives_up_run(self,
+                                        settings_mock: MagicMock,
+                                        db_mock: MagicMock,
+                                        runtime_mock: MagicMock,
+                                        time_mock: MagicMock):
+        # Setup
+
+        self.getter._sync = Mock()
+        settings_mock.APIs.lastfm_sync_attempts_limit = 3
+        runtime_mock.Runtime.run.return_value = SyncStats(total_pages=3)
+        run = db_mock.ScrobbleSyncRuns.get_unfinished.return_value
+        run.attempts = 3
+        run.total_pages = 3
+        run.get_stored_pages.return_value = {1}
+        new_run = db_mock.ScrobbleSyncRuns.add.return_value
+
+        # Run
+
+        self.getter.get_scrobbles()
+
+        # Assertions
+
+        run.mark_as_finished.assert_called_once_with(total_pages=3, failed_pages={2, 3})
+        run.add_attempt.assert_not_called()
+        db_mock.ScrobbleSyncRuns.add.assert_called_once()
+        self.getter._sync.assert_called_once_with(run=new_run, stored_pages=set())
+
+    def test_get_scrobbles_with_failed_pages(self, db_mock: MagicMock, runtime_mock: MagicMock, time_mock: MagicMock):
+
+        # Setup
+
+        self.getter._sync = Mock()
+        self.getter._failed_pages = [2]
+        runtime_mock.Runtime.run.return_value = SyncStats(total_pages=2)
+        db_mock.ScrobbleSyncRuns.get_unfinished.return_value = None
+
+        # Run
+
+        self.getter.get_scrobbles()
+
+        # Assertions
+
+        db_mock.ScrobbleSyncRuns.add.return_value.mark_as_finished.assert_not_called()
+
+    def test_get_scrobbles_is_incremental(self, db_mock: MagicMock, runtime_mock: MagicMock, time_mock: MagicMock):
+
+        # Setup
+
+        self.getter._sync = Mock()
+        runtime_mock.Runtime.run.return_value = SyncStats()
+        db_mock.ScrobbleSyncRuns.get_unfinished.return_value = None
+
+        # Run
+
+        self.getter.get_scrobbles()
+
+        # Assertions
+
+        db_mock.ScrobbleSyncRuns.add.assert_called_once()
+        self.assertEqual(
+            db_mock.ScrobbleSyncRuns.add.call_args.kwargs['date_from'],
+            db_mock.ScrobbleSyncRuns.get_high_water_mark.return_value
         )
 
+    def test_get_scrobbles_full_resync(self, db_mock: MagicMock, runtime_mock: MagicMock, time_mock: MagicMock):
+
+        # Setup
+
+        self.getter._sync = Mock()
+        runtime_mock.Runtime.run.return_value = SyncStats()
+
+        # Run
+
+        self.getter.get_scrobbles(full_resync=True)
+
+        # Assertions
+
+        db_mock.ScrobbleSyncRuns.supersede_unfinished.assert_called_once_with()
+        db_mock.ScrobbleSyncRuns.get_unfinished.assert_not_called()
+        db_mock.ScrobbleSyncRuns.get_high_water_mark.assert_not_called()
+        self.assertIsNone(db_mock.ScrobbleSyncRuns.add.call_args.kwargs['date_from'])
+
     @patch('getters.getter_lastfm_scrobble_data.sentry')
-    def test_get_scrobbles_exception(self, sentry_mock: MagicMock, cache_mock: MagicMock, time_mock: MagicMock):
+    def test_get_scrobbles_exception(self,
+                                     sentry_mock: MagicMock,
+                                     db_mock: MagicMock,
+                                     runtime_mock: MagicMock,
+                                     time_mock: MagicMock):
         # Setup
 
         exception = Exception()
-        self.getter._get_pages = Mock(side_effect=exception)
+        self.getter._sync = Mock()
+        runtime_mock.Runtime.run.side_effect = exception
+        db_mock.ScrobbleSyncRuns.get_unfinished.return_value = None
 
         # Run
 
@@ -77,24 +193,359 @@ class TestGetScrobbles(TestLastFMScrobbleDataGetter):
 
         # Assertions
 
-        cache_mock.Caching.get_scrobble_id.assert_not_called()
+        db_mock.ScrobbleSyncRuns.add.return_value.mark_as_finished.assert_not_called()
         sentry_mock.capture_exception.assert_called_once_with(exception)
 
 
-class TestGetPages(TestLastFMScrobbleDataGetter):
+@patch('getters.getter_lastfm_scrobble_data.runtime')
+class TestGetScrobblesRuns(DatabaseTestCase):
+    """
+    Unit tests for sync runs of "LastFMScrobbleDataGetter.get_scrobbles" method with a real database
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        super().setUp()
+        with patch('getters.getter_lastfm_scrobble_data.logger'):
+            self.getter = LastFMScrobbleDataGetter()
+        self.getter._sync = Mock()
+
+    def test_run_with_failed_page_is_given_up(self, runtime_mock: MagicMock):
+
+        # Setup
+
+        def sync(run: ScrobbleSyncRuns, stored_pages: set[int]) -> None:
+            run.set_total_pages(2)
+            ScrobbleSyncPages.add(run_id=run.id, page=1)
+
+        self.getter._sync.side_effect = sync
+        runtime_mock.Runtime.run.return_value = SyncStats(total_pages=2)
+        self.getter._failed_pages = [2]
+        attempts_limit = settings.APIs.lastfm_sync_attempts_limit
+
+        # Run
+
+        for _ in range(attempts_limit + 1):
+            self.getter.get_scrobbles()
+
+        # Assertions
+
+        given_up, new = ScrobbleSyncRuns.select().order_by(ScrobbleSyncRuns.id)
+        self.assertEqual(given_up.attempts, attempts_limit)
+        self.assertIsNotNone(given_up.finished)
+        self.assertEqual(given_up.get_failed_pages(), [2])
+        self.assertIsNone(new.finished)
+        self.assertEqual(new.date_from, given_up.date_to)
+        self.assertEqual(ScrobbleSyncRuns.get_high_water_mark(), given_up.date_to)
+
+    def test_full_resync_supersedes_interrupted_run(self, runtime_mock: MagicMock):
+
+        # Setup
+
+        runtime_mock.Runtime.run.return_value = SyncStats(total_pages=2)
+        self.getter._failed_pages = [2]
+        self.getter.get_scrobbles()
+        self.getter._failed_pages = []
+
+        # Run
+
+        self.getter.get_scrobbles(full_resync=True)
+        self.getter.get_scrobbles()
+
+        # Assertions
+
+        interrupted, full, regular = ScrobbleSyncRuns.select().order_by(ScrobbleSyncRuns.id)
+        self.assertIsNotNone(interrupted.finished)
+        self.assertEqual(interrupted.attempts, 1)
+        self.assertTrue(full.is_full)
+        self.assertIsNone(full.date_from)
+        self.assertIsNotNone(full.finished)
+        self.assertEqual(regular.date_from, full.date_to)
+
+
+@patch('getters.getter_lastfm_scrobble_data.runtime')
+class TestSyncWithDataBase(DatabaseTestCase):
     """
-    Unit tests for "_ProtoWorkerBMCUpdater.get_scrobbles" method.
+    Unit tests for "LastFMScrobbleDataGetter._sync" method with a real database and its writer thread
     """
 
-    def test__get_pages_is_ok(self,):
+    is_shared = True
+
+    def setUp(self) -> None:
+        """Set up test."""
+        super().setUp()
+        with patch('getters.getter_lastfm_scrobble_data.logger'):
+            self.getter = LastFMScrobbleDataGetter()
+
+    @staticmethod
+    def get_page(number: int) -> Page:
+        page = Page(number)
+        page.scrobbles.append(artist='Muse', album='Drones', track=f'Track {number}', timestamp=1700000000 + number)
+        return page
+
+    def test_sync_finishes_run(self, runtime_mock: MagicMock):
 
         # Setup
 
-        self.getter._get_total_pages_count = Mock()
-        self.getter._make_requests = Mock()
+        runtime_mock.Runtime.run.side_effect = asyncio.run
+        self.getter._get_total_pages_count = AsyncMock(return_value=2)
+        self.getter._get_page_with_retries = AsyncMock(
+            side_effect=lambda url, number, session, stats: self.get_page(number)
+        )
 
         # Run
 
         self.getter.get_scrobbles()
 
         # Assertions
+
+        run = ScrobbleSyncRuns.get()
+        self.assertIsNotNone(run.finished)
+        self.assertEqual(run.total_pages, 2)
+        self.assertEqual(run.get_stored_pages(), {1, 2})
+        self.assertEqual(Scrobbles.select().count(), 2)
+
+    def test_refetch_failed_pages(self, runtime_mock: MagicMock):
+
+        # Setup
+
+        runtime_mock.Runtime.run.side_effect = asyncio.run
+        self.getter._get_total_pages_count = AsyncMock(return_value=3)
+        self.getter._get_page_with_retries = AsyncMock(
+            side_effect=lambda url, number, session, stats: self.get_page(number) if number == 2 else None
+        )
+        run = ScrobbleSyncRuns.add(date_from=None, date_to=datetime.datetime(2024, 1, 1), is_full=False)
+        run.mark_as_finished(total_pages=3, failed_pages=[2, 3])
+
+        # Run
+
+        self.getter.refetch_failed_pages()
+
+        # Assertions
+
+        self.assertEqual(
+            [call.kwargs['number'] for call in self.getter._get_page_with_retries.await_args_list], [2, 3]
+        )
+        run = ScrobbleSyncRuns.get()
+        self.assertEqual(run.get_failed_pages(), [3])
+        self.assertEqual(run.get_stored_pages(), {2})
+        self.assertEqual(Scrobbles.select().count(), 1)
+        self.assertEqual(ScrobbleSyncRuns.get_high_water_mark(), datetime.datetime(2024, 1, 1))
+
+
+@patch('getters.getter_lastfm_scrobble_data.runtime')
+@patch('getters.getter_lastfm_scrobble_data.db')
+class TestSync(TestLastFMScrobbleDataGetter):
+    """
+    Unit tests for "LastFMScrobbleDataGetter._sync" method.
+    """
+
+    run = Mock(id=1, date_from=None, date_to=datetime.datetime(2021, 1, 1))
+
+    def test__sync_is_ok(self, db_mock: MagicMock, runtime_mock: MagicMock):
+
+        # Setup
+
+        self.getter._get_total_pages_count = AsyncMock(return_value=3)
+        self.getter._get_page_data = AsyncMock(side_effect=lambda url, number, session: Page(number, [Mock()]))
+        db_mock.Scrobbles.add_many.return_value = Mock(inserted=1, skipped=0)
+
+        # Run
+
+        stats = asyncio.run(self.getter._sync(run=self.run, stored_pages=set()))
+
+        # Assertions
+
+        self.assertEqual(db_mock.Scrobbles.add_many.call_count, 3)
+        self.assertEqual((stats.total_pages, stats.pages_fetched, stats.rows_inserted), (3, 3, 3))
+        self.assertEqual(
+            sorted(call.kwargs['page'] for call in db_mock.ScrobbleSyncPages.add.call_args_list),
+            [1, 2, 3]
+        )
+        self.assertEqual(self.getter._failed_pages, [])
+
+    def test__sync_skips_stored_pages(self, db_mock: MagicMock, runtime_mock: MagicMock):
+
+        # Setup
+
+        self.getter._get_total_pages_count = AsyncMock(return_value=3)
+        self.getter._get_page_data = AsyncMock(side_effect=lambda url, number, session: Page(number, [Mock()]))
+        db_mock.Scrobbles.add_many.return_value = Mock(inserted=1, skipped=0)
+
+        # Run
+
+        stats = asyncio.run(self.getter._sync(run=self.run, stored_pages={1, 3}))
+
+        # Assertions
+
+        self.getter._get_page_data.assert_called_once()
+        self.assertEqual(self.getter._get_page_data.call_args.kwargs['number'], 2)
+        self.assertEqual((stats.total_pages, stats.pages_fetched), (3, 1))
+
+    @patch('getters.getter_lastfm_scrobble_data.random')
+    def test__sync_retries_failed_pages(self, random_mock: MagicMock, db_mock: MagicMock, runtime_mock: MagicMock):
+
+        # Setup
+
+        random_mock.uniform.return_value = 0
+        failures = {2}
+
+        def get_page_data(url, number, session):
+            if number in failures:
+                failures.remove(number)
+                raise LastFMResponseError(status=429)
+            return Page(number, [Mock()])
+
+        self.getter._get_total_pages_count = AsyncMock(return_value=3)
+        self.getter._get_page_data = AsyncMock(side_effect=get_page_data)
+        db_mock.Scrobbles.add_many.return_value = Mock(inserted=1, skipped=0)
+
+        # Run
+
+        stats = asyncio.run(self.getter._sync(run=self.run, stored_pages=set()))
+
+        # Assertions
+
+        self.assertEqual(self.getter._get_page_data.call_count, 4)
+        self.assertEqual((stats.rows_inserted, stats.retries, stats.throttled), (3, 1, 1))
+        self.assertEqual(self.getter._failed_pages, [])
+
+    @patch('getters.getter_lastfm_scrobble_data.sentry')
+    def test__sync_keeps_good_pages(self, sentry_mock: MagicMock, db_mock: MagicMock, runtime_mock: MagicMock):
+
+        # Setup
+
+        def get_page_data(url, number, session):
+            if number == 2:
+                raise LastFMResponseError(status=400, code=6)
+            return Page(number, [Mock()])
+
+        self.getter._get_total_pages_count = AsyncMock(return_value=3)
+        self.getter._get_page_data = AsyncMock(side_effect=get_page_data)
+        db_mock.Scrobbles.add_many.return_value = Mock(inserted=1, skipped=0)
+
+        # Run
+
+        stats = asyncio.run(self.getter._sync(run=self.run, stored_pages=set()))
+
+        # Assertions
+
+        self.assertEqual(self.getter._get_page_data.call_count, 3)
+        self.assertEqual((stats.rows_inserted, stats.retries), (2, 0))
+        self.assertEqual(self.getter._failed_pages, [2])
+
+
+class TestSetDateRange(TestLastFMScrobbleDataGetter):
+    """
+    Unit tests for "LastFMScrobbleDataGetter._set_date_range" method.
+    """
+
+    def test__set_date_range_is_ok(self):
+
+        # Run
+
+        url = self.getter._set_date_range(
+            url='http://test?format=json',
+            date_from=datetime.datetime(2021, 1, 1),
+            date_to=datetime.datetime(2021, 1, 2)
+        )
+
+        # Assertions
+
+        self.assertEqual(url, 'http://test?format=json&from=1609459200&to=1609545600')
+
+    def test__set_date_range_without_date_from(self):
+
+        # Run
+
+        url = self.getter._set_date_range(
+            url='http://test?format=json',
+            date_from=None,
+            date_to=datetime.datetime(2021, 1, 2)
+        )
+
+        # Assertions
+
+        self.assertEqual(url, 'http://test?format=json&to=1609545600')
+
+
+class TestParsePage(TestLastFMScrobbleDataGetter):
+    """
+    Unit tests for "LastFMScrobbleDataGetter._parse_page" method.
+    """
+
+    data = {
+        'recenttracks': {
+            'track': [
+                {
+                    'artist': {'mbid': '', '#text': 'Artist'},
+                    'streamable': '0',
+                    'image': [{'size': 'small', '#text': ''}],
+                    'mbid': '',
+                    'album': {'mbid': '', '#text': 'Album'},
+                    'name': 'Now playing',
+                    '@attr': {'nowplaying': 'true'},
+                    'url': ''
+                },
+                {
+                    'artist': {'mbid': '', '#text': 'Artist'},
+                    'streamable': '0',
+                    'image': [{'size': 'small', '#text': ''}],
+                    'mbid': '',
+                    'album': {'mbid': '', '#text': 'Album'},
+                    'name': 'Track',
+                    'url': '',
+                    'date': {'uts': '1609459200', '#text': '01 Jan 2021, 00:00'}
+                }
+            ],
+            '@attr': {'user': 'user', 'totalPages': '1', 'page': '1', 'perPage': '200', 'total': '1'}
+        }
+    }
+
+    def test__parse_page_is_ok(self):
+        for strict in (False, True):
+            with self.subTest(strict=strict):
+
+                # Run
+
+                page = self.getter._parse_page(data=self.data, number=3, strict=strict)
+
+                # Assertions
+
+                self.assertEqual(page.number, 3)
+                self.assertEqual(len(page.scrobbles), 1)
+                self.assertEqual(
+                    (page.scrobbles[0].artist, page.scrobbles[0].album, page.scrobbles[0].track),
+                    ('Artist', 'Album', 'Track')
+                )
+                self.assertEqual(page.scrobbles[0].date, datetime.datetime(2021, 1, 1))
+
+
+class TestScrobbleBatch(unittest.TestCase):
+    """
+    Unit tests for "getters.getter_lastfm_scrobble_data.ScrobbleBatch" class.
+    """
+
+    def test_append_and_iterate(self):
+
+        # Setup
+
+        batch = ScrobbleBatch()
+
+        # Run
+
+        batch.append(artist='Artist', album='Album', track='First', timestamp=1609459200)
+        batch.append(artist=''.join(['Art', 'ist']), album='Album', track='Second', timestamp=1609459260)
+
+        # Assertions
+
+        self.assertEqual(len(batch), 2)
+        self.assertIs(batch.artists[0], batch.artists[1])
+        self.assertEqual(
+            list(batch),
+            [
+                Scrobble(album='Album', artist='Artist', date=datetime.datetime(2021, 1, 1), track='First'),
+                Scrobble(album='Album', artist='Artist', date=datetime.datetime(2021, 1, 1, 0, 1), track='Second')
+            ]
+        )
+        self.assertEqual(batch[1].track, 'Second')
@@ -0,0 +1,179 @@
+"""
+Unit tests for "getters.getter_place_details.GetterPlaceDetails" class
+"""
+
+import asyncio
+import datetime
+import unittest
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+
+import database as db
+from getters import GetterPlaceDetails
+from getters.getter_place_details import PlaceDetails, PlacesCache
+from tests.database_test_case import DatabaseTestCase
+
+
+class TestGetterPlaceDetails(unittest.TestCase):
+    """
+    Base class for "GetterPlaceDetails" tests
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        with patch('getters.getter_events.logger'):
+            self.getter = GetterPlaceDetails(places_ids=[1, 2, 3])
+
+
+@patch('getters.getter_place_details.runtime')
+@patch('getters.getter_place_details.PlacesCache')
+class TestGetData(TestGetterPlaceDetails):
+    """
+    Unit tests for "GetterPlaceDetails.get_data" method
+    """
+
+    def test_get_data_requests_missing_places_only(self, cache_mock: MagicMock, runtime_mock: MagicMock):
+
+        # Setup
+
+        known = PlaceDetails(id=1, address='Address', title='Known')
+        fetched = [
+            PlaceDetails(id=2, address='Address', title='Second'),
+            PlaceDetails(id=3, address='Address', title='Third')
+        ]
+        cache_mock.get_many.return_value = {1: known}
+        self.getter._get_places_data = Mock()
+        runtime_mock.Runtime.run.return_value = fetched
+
+        # Run
+
+        result = self.getter.get_data()
+
+        # Assertions
+
+        self.getter._get_places_data.assert_called_once_with([2, 3])
+        self.assertEqual(result, [known] + fetched)
+        cache_mock.put_many.assert_called_once_with(fetched)
+
+    def test_get_data_all_places_are_known(self, cache_mock: MagicMock, runtime_mock: MagicMock):
+
+        # Setup
+
+        cache_mock.get_many.return_value = {
+            place_id: PlaceDetails(id=place_id, address='Address', title='Known') for place_id in (1, 2, 3)
+        }
+        self.getter._get_places_data = Mock()
+
+        # Run
+
+        result = self.getter.get_data()
+
+        # Assertions
+
+        self.getter._get_places_data.assert_not_called()
+        self.assertEqual(len(result), 3)
+
+
+@patch('getters.getter_place_details.kudago_limiter', new=Mock(acquire=AsyncMock()))
+@patch('getters.getter_place_details.runtime')
+class TestGetPlacesData(TestGetterPlaceDetails):
+    """
+    Unit tests for "GetterPlaceDetails._get_places_data" method
+    """
+
+    def test__get_places_data_retries_failed_places_only(self, runtime_mock: MagicMock):
+
+        # Setup
+
+        failures = {2}
+
+        def get_place_details(place_id, session):
+            if place_id in failures:
+                failures.remove(place_id)
+                return None
+            return {'id': place_id, 'address': 'Address', 'title': 'Title'}
+
+        self.getter._get_place_details = AsyncMock(side_effect=get_place_details)
+
+        # Run
+
+        result = asyncio.run(self.getter._get_places_data([1, 2, 3]))
+
+        # Assertions
+
+        self.assertEqual(
+            [call.kwargs['place_id'] for call in self.getter._get_place_details.call_args_list],
+            [1, 2, 3, 2]
+        )
+        self.assertEqual(sorted(place.id for place in result), [1, 2, 3])
+        self.assertEqual(self.getter._ids_for_retry, [])
+
+    def test__get_places_data_gives_up(self, runtime_mock: MagicMock):
+
+        # Setup
+
+        self.getter._get_place_details = AsyncMock(return_value=None)
+
+        # Run
+
+        result = asyncio.run(self.getter._get_places_data([1]))
+
+        # Assertions
+
+        self.assertEqual(self.getter._get_place_details.call_count, 6)
+        self.assertEqual(result, [])
+        self.assertEqual(self.getter._ids_for_retry, [1])
+
+
+@patch('getters.getter_place_details.settings')
+class TestPlacesCache(DatabaseTestCase):
+    """
+    Unit tests for "PlacesCache" class with a real database
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        super().setUp()
+        self.addCleanup(setattr, PlacesCache, '_places', PlacesCache._places)
+        self.addCleanup(setattr, PlacesCache, '_is_loaded', PlacesCache._is_loaded)
+        PlacesCache._places = {}
+        PlacesCache._is_loaded = False
+
+    def test_get_many_ages_stored_places(self, settings_mock: MagicMock):
+
+        # Setup
+
+        settings_mock.App.place_details_ttl = 100
+        now = datetime.datetime.now()
+        db.Places.insert_many([
+            {'place_id': 1, 'address': 'Address', 'title': 'Fresh', 'fetched': now - datetime.timedelta(seconds=50)},
+            {'place_id': 2, 'address': 'Address', 'title': 'Expired', 'fetched': now - datetime.timedelta(seconds=150)},
+            {'place_id': 3, 'address': 'Address', 'title': 'Unknown age', 'fetched': None}
+        ]).execute()
+
+        # Run
+
+        fresh = PlacesCache.get_many([1, 2, 3, 4])
+        stale = PlacesCache.get_many([1, 2, 3, 4], fresh_only=False)
+
+        # Assertions
+
+        self.assertEqual(list(fresh), [1])
+        self.assertEqual(list(stale), [1, 2, 3])
+        self.assertEqual(stale[2].fetched, now - datetime.timedelta(seconds=150))
+
+    def test_put_many_adds_fresh_places(self, settings_mock: MagicMock):
+
+        # Setup
+
+        settings_mock.App.place_details_ttl = 100
+        place = PlaceDetails(id=1, address='Address', title='Title')
+
+        # Run
+
+        PlacesCache.put_many([place])
+        result = PlacesCache.get_many([1])
+
+        # Assertions
+
+        self.assertEqual(result, {1: place})
+        self.assertFalse(db.Places.select().exists())
@@ -0,0 +1,118 @@
+"""
+Unit tests for "getters.limiters" module
+"""
+
+import asyncio
+import unittest
+from unittest.mock import patch, MagicMock
+
+from getters.limiters import SlidingWindowLimiter, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    """
+    Unit tests for "TokenBucket" class
+    """
+
+    def test_acquire_within_capacity(self):
+
+        # Setup
+
+        bucket = TokenBucket(rate=5)
+
+        # Run
+
+        async def acquire():
+            for _ in range(5):
+                await bucket.acquire()
+
+        with patch('getters.limiters.asyncio.sleep') as sleep_mock:
+            asyncio.run(acquire())
+
+        # Assertions
+
+        sleep_mock.assert_not_called()
+
+    @patch('getters.limiters.time')
+    def test_throttle_and_succeed(self, time_mock: MagicMock):
+
+        # Setup
+
+        time_mock.monotonic.return_value = 100
+        bucket = TokenBucket(rate=4, min_rate=1)
+
+        # Run
+
+        bucket.throttle(delay=10)
+        bucket.throttle(delay=5)
+
+        # Assertions
+
+        self.assertEqual(bucket.throttled, 2)
+        self.assertEqual(bucket.rate, 1)
+        self.assertEqual(bucket._paused_until, 110)
+
+        # Run
+
+        for _ in range(20):
+            bucket.succeed()
+
+        # Assertions
+
+        self.assertEqual(bucket.rate, 4)
+
+
+class TestSlidingWindowLimiter(unittest.TestCase):
+    """
+    Unit tests for "SlidingWindowLimiter" class
+    """
+
+    @patch('getters.limiters.time')
+    def test_acquire_waits_for_the_oldest_call(self, time_mock: MagicMock):
+
+        # Setup
+
+        clock = [100.0]
+        time_mock.monotonic.side_effect = lambda: clock[0]
+        limiter = SlidingWindowLimiter(max_calls=2, period=1.0)
+        delays = []
+
+        async def sleep(delay):
+            delays.append(delay)
+            clock[0] += delay
+
+        async def acquire():
+            await limiter.acquire()
+            clock[0] += 0.25
+            await limiter.acquire()
+            await limiter.acquire()
+
+        # Run
+
+        with patch('getters.limiters.asyncio.sleep', new=sleep):
+            asyncio.run(acquire())
+
+        # Assertions
+
+        self.assertEqual(delays, [0.75])
+        self.assertEqual(list(limiter._calls), [100.25, 101.0])
+
+    def test_acquire_in_another_event_loop(self):
+
+        # Setup
+
+        limiter = SlidingWindowLimiter(max_calls=1, period=0.01)
+
+        async def acquire():
+            # The third call waits for the lock held by the sleeping second one, which binds it to the loop.
+            return await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+
+        asyncio.run(acquire())
+
+        # Run
+
+        result = asyncio.run(acquire())
+
+        # Assertions
+
+        self.assertEqual(result, [None, None, None])
@@ -0,0 +1,105 @@
+"""
+Unit tests for "parsers.parser_api.ParserApi" class
+"""
+
+import datetime
+from unittest.mock import patch
+
+import database as db
+import schemas
+from parsers import ParserApi
+from tests.database_test_case import DatabaseTestCase
+
+
+def get_event(event_id: int, title: str = 'Muse', day: int = 1) -> schemas.Event:
+    start = datetime.datetime(2024, 6, day, 19)
+    return schemas.Event(
+        id=event_id,
+        dates=[{'start': start, 'end': start + datetime.timedelta(hours=3)}],
+        title=title,
+        slug=f'event-{event_id}',
+        place={'id': 1},
+        price='1000'
+    )
+
+
+class TestStoreEvents(DatabaseTestCase):
+    """
+    Unit tests for "ParserApi._store_events" method with a real database
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        super().setUp()
+        with patch('parsers.parser_api.logger'):
+            self.parser = ParserApi()
+        db.Places.create(place_id=1, address='Address', title='Club')
+
+    def test_new_events_are_inserted(self):
+
+        # Run
+
+        self.parser._store_events([get_event(1), get_event(2)])
+
+        # Assertions
+
+        self.assertEqual(
+            list(
+                db.Events
+                .select(db.Events.event_id, db.Events.updated, db.Events.is_sent)
+                .order_by(db.Events.event_id)
+                .tuples()
+            ),
+            [(1, False, False), (2, False, False)]
+        )
+        self.assertEqual(db.EventDates.select().count(), 2)
+        self.assertEqual(set(db.EventHashes.get_hashes([1, 2])), {1, 2})
+
+    def test_unchanged_events_are_skipped(self):
+
+        # Setup
+
+        self.parser._store_events([get_event(1)])
+        db.Events.update(is_sent=True).execute()
+        dates_ids = list(db.EventDates.select(db.EventDates.id).tuples())
+
+        # Run
+
+        with patch.object(db.Events, 'add_many', wraps=db.Events.add_many) as add_many:
+            self.parser._store_events([get_event(1)])
+
+        # Assertions
+
+        self.assertEqual([list(call.args[0]) for call in add_many.call_args_list], [[], []])
+        event = db.Events.get()
+        self.assertTrue(event.is_sent)
+        self.assertFalse(event.updated)
+        self.assertEqual(list(db.EventDates.select(db.EventDates.id).tuples()), dates_ids)
+
+    def test_changed_events_are_updated(self):
+
+        # Setup
+
+        self.parser._store_events([get_event(1), get_event(2)])
+        db.Events.update(is_sent=True).execute()
+        hashes = db.EventHashes.get_hashes([1, 2])
+
+        # Run
+
+        self.parser._store_events([get_event(1, title='Muse. Extra show'), get_event(2), get_event(3)])
+
+        # Assertions
+
+        self.assertEqual(
+            list(
+                db.Events
+                .select(db.Events.event_id, db.Events.title, db.Events.updated, db.Events.is_sent)
+                .order_by(db.Events.event_id)
+                .tuples()
+            ),
+            [(1, 'Muse. Extra show', True, False), (2, 'Muse', False, True), (3, 'Muse', False, False)]
+        )
+        new_hashes = db.EventHashes.get_hashes([1, 2, 3])
+        self.assertNotEqual(new_hashes[1], hashes[1])
+        self.assertEqual(new_hashes[2], hashes[2])
+        self.assertIn(3, new_hashes)
@@ -0,0 +1,96 @@
+"""
+Unit tests for "runtime.runtime" module
+"""
+
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from runtime import Runtime
+
+
+@patch.object(Runtime, '_logger')
+class TestRuntime(unittest.TestCase):
+    """
+    Unit tests for "Runtime" class
+    """
+
+    def setUp(self) -> None:
+        """Set up test."""
+        self.addCleanup(Runtime.shutdown)
+
+    def test_get_loop_starts_loop_once(self, _):
+
+        # Run
+
+        loop = Runtime.get_loop()
+
+        # Assertions
+
+        self.assertIs(Runtime.get_loop(), loop)
+        self.assertTrue(loop.is_running())
+        self.assertTrue(Runtime._thread.is_alive())
+        self.assertTrue(Runtime._thread.daemon)
+
+    def test_run_from_worker_thread(self, _):
+
+        # Setup
+
+        results = []
+
+        async def get_running_loop(value):
+            return asyncio.get_running_loop(), value
+
+        def work():
+            results.append(Runtime.run(get_running_loop(42)))
+
+        # Run
+
+        worker = threading.Thread(target=work)
+        worker.start()
+        worker.join()
+
+        # Assertions
+
+        self.assertEqual(results, [(Runtime.get_loop(), 42)])
+
+    def test_get_session_is_reused_per_upstream(self, _):
+
+        # Setup
+
+        async def get_sessions():
+            return Runtime.get_session('lastfm'), Runtime.get_session('lastfm'), Runtime.get_session('kudago')
+
+        # Run
+
+        lastfm, lastfm_again, kudago = Runtime.run(get_sessions())
+
+        # Assertions
+
+        self.assertIs(lastfm, lastfm_again)
+        self.assertIsNot(lastfm, kudago)
+        self.assertEqual(lastfm.connector.limit, 5)
+        self.assertEqual(kudago.connector.limit, 6)
+
+    def test_shutdown_closes_sessions(self, _):
+
+        # Setup
+
+        async def get_session():
+            return Runtime.get_session('lastfm')
+
+        session = Runtime.run(get_session())
+        loop, thread = Runtime._loop, Runtime._thread
+
+        # Run
+
+        Runtime.shutdown()
+
+        # Assertions
+
+        self.assertTrue(session.closed)
+        self.assertEqual(Runtime._sessions, {})
+        self.assertIsNone(Runtime._loop)
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(loop.is_closed())
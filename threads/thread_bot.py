@@ -3,6 +3,7 @@ import threading
 import time
 
 import bot
+import database as db
 import logger
 
 
@@ -28,10 +29,14 @@ class BotThread(threading.Thread):
                 while (datetime.datetime.now() - start_time).seconds < (self.timeout + 1):
                     time.sleep(2)
                 try:
-                    bot.Bot().start()
+                    with db.unit_of_work():
+                        bot.Bot().start()
                 except RuntimeError as e:
                     self.logger.warning(e, exc_info=True)
                     self.logger.info(f'Threads count – {threading.active_count()}')
+                pool_stats = db.get_pool_stats()
+                if pool_stats:
+                    self.logger.info(f'DB pool stats – {pool_stats}')
 
     def pause(self) -> None:
         self._is_running.clear()
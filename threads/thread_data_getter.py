@@ -2,6 +2,7 @@ import datetime
 import threading
 import time
 
+import database as db
 import getters
 import logger
 
@@ -28,10 +29,14 @@ class LastFMScrobbleDataThread(threading.Thread):
                 while (datetime.datetime.now() - start_time).seconds < (self.timeout + 1):
                     time.sleep(2)
                 try:
-                    getters.LastFMScrobbleDataGetter().get_scrobbles()
+                    with db.unit_of_work():
+                        getters.LastFMScrobbleDataGetter().get_scrobbles()
                 except RuntimeError as e:
                     self.logger.warning(e, exc_info=True)
                     self.logger.info(f'Threads count – {threading.active_count()}')
+                pool_stats = db.get_pool_stats()
+                if pool_stats:
+                    self.logger.info(f'DB pool stats – {pool_stats}')
 
     def pause(self) -> None:
         self._is_running.clear()
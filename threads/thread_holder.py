@@ -1,5 +1,7 @@
 import typing
 
+import database as db
+import runtime
 import settings
 import threads
 
@@ -20,6 +22,8 @@ class ThreadHolder:
             if thread:
                 thread.stop()
                 thread.join()
+        db.Log.flush()
+        runtime.Runtime.shutdown()
 
     @classmethod
     def get_lastfm_data_thread(cls) -> threads.LastFMScrobbleDataThread: